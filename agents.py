@@ -0,0 +1,59 @@
+import random
+
+from snake_env import DELTAS
+from snake_vec_env import greedy_features_model, single_game_policy
+
+# Políticas para o SnakeEnv. Cada entrada é uma fábrica `fabrica(seed) -> politica`, onde
+# `politica(env)` recebe o ambiente e devolve a próxima direção (ou None para seguir em frente).
+
+
+def aleatorio(seed=None):
+    """Escolhe uma direção aleatória a cada tick."""
+    rng = random.Random(seed)
+    return lambda env: rng.randrange(4)
+
+
+def heuristico(seed=None):
+    """
+    Vai na direção da comida pelo caminho mais curto, evitando paredes e o próprio corpo no
+    próximo passo. Empates são desfeitos aleatoriamente.
+    """
+    rng = random.Random(seed)
+
+    def politica(env):
+        head_x, head_y = env.head
+        food_x, food_y = env.food_pos if env.food_pos is not None else env.head
+        tail_x, tail_y = env.snake_body[-1]
+        melhores, melhor_distancia = [], None
+        for direcao, (dx, dy) in enumerate(DELTAS):
+            if direcao == (env.direction + 2) % 4:
+                continue
+            x, y = head_x + dx, head_y + dy
+            if not (0 <= x < env.cols and 0 <= y < env.rows):
+                continue
+            # A célula da cauda fica livre neste tick, a menos que a cobra coma.
+            if env.occupancy[y * env.cols + x] and (x, y) != (tail_x, tail_y):
+                continue
+            distancia = abs(food_x - x) + abs(food_y - y)
+            if melhor_distancia is None or distancia < melhor_distancia:
+                melhores, melhor_distancia = [direcao], distancia
+            elif distancia == melhor_distancia:
+                melhores.append(direcao)
+        return rng.choice(melhores) if melhores else None
+
+    return politica
+
+
+def modelo_em_lote(seed=None):
+    """
+    Um modelo em lote (snake_vec_env.greedy_features_model, que recebe o vetor de características de
+    N partidas) jogando uma partida por vez. Serve de modelo para plugar um modelo treinado.
+    """
+    return single_game_policy(greedy_features_model, "features")
+
+
+POLITICAS = {
+    "aleatorio": aleatorio,
+    "heuristico": heuristico,
+    "modelo_em_lote": modelo_em_lote,
+}
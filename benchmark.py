@@ -0,0 +1,269 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from agents import heuristico
+from gen_fake_data import PERFIS, gerar_dados_falsos
+from incremental_loader import IncrementalLoader
+from leaderboard import MetricasCache, montar_leaderboard, probabilidades_ranking, ranquear
+from snake_env import SnakeEnv
+from snake_vec_env import BatchSnakeEnv, random_policy
+from stats_math import grouped_rolling_mean, grouped_slopes
+
+# Suíte de benchmarks do jogo headless, da ingestão e dos cálculos do dashboard, sobre dados sintéticos
+# gerados com seed fixa. Cada etapa registra o melhor tempo entre as repetições e o pico de memória
+# (tracemalloc, medido em uma execução separada para não distorcer o tempo).
+
+# (partidas no total, agentes) de cada escala.
+ESCALAS = {
+    "rapida": [(1_000, 3), (100_000, 3), (100_000, 10)],
+    "padrao": [(1_000, 3), (100_000, 10), (1_000_000, 10), (1_000_000, 50)],
+    "completa": [(1_000, 3), (100_000, 10), (1_000_000, 10), (1_000_000, 50), (10_000_000, 3), (10_000_000, 50)],
+}
+JANELA = 100
+LIMIAR = 10
+
+
+def medir(funcao, repeticoes):
+    """Melhor tempo (s) entre `repeticoes` execuções e o resultado da última."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def pico_memoria(funcao):
+    """Pico de memória alocada (bytes) durante uma execução de `funcao`."""
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def gerar_dados(diretorio, partidas, agentes, formato, seed):
+    """Gera `partidas` partidas divididas entre `agentes` arquivos stats_agente_NN, alternando os perfis."""
+    perfis = sorted(PERFIS)
+    por_agente = partidas // agentes
+    with contextlib.redirect_stdout(io.StringIO()):
+        for a in range(agentes):
+            caminho = os.path.join(diretorio, f"stats_agente_{a:02d}.{formato}")
+            gerar_dados_falsos(caminho, por_agente, perfis[a % len(perfis)], seed=seed + a)
+
+
+# --- 1. ETAPAS ---
+# Cada etapa recebe o contexto da escala e retorna uma função sem argumentos que executa o trabalho medido,
+# e a quantidade de itens processados (para calcular a vazão).
+
+def etapa_passos_env(ctx):
+    """Passos por segundo de um SnakeEnv jogado pelo agente heurístico, reiniciando a cada fim de jogo."""
+    passos = ctx["passos"]
+
+    def rodar():
+        env = SnakeEnv(seed=0)
+        politica = heuristico(0)
+        for _ in range(passos):
+            env.step(politica(env))
+            if env.game_over:
+                env.reset()
+    return rodar, passos
+
+
+def etapa_passos_lote(ctx):
+    """Passos por segundo (somando todas as partidas) do BatchSnakeEnv com a política aleatória."""
+    num_envs, ticks = 1024, max(1, ctx["passos"] // 1024)
+
+    def rodar():
+        env = BatchSnakeEnv(num_envs, seed=0)
+        for _ in range(ticks):
+            env.step(random_policy(env))
+    return rodar, num_envs * ticks
+
+
+def etapa_carregar_json(ctx):
+    """Leitura e concatenação de todos os arquivos, como em load_all_data (carregador novo a cada vez)."""
+    padroes = (os.path.join(ctx["diretorio"], "stats_*.json"), os.path.join(ctx["diretorio"], "stats_*.jsonl"))
+
+    def rodar():
+        loader = IncrementalLoader(padroes)
+        loader.atualizar()
+        return loader.dados
+    return rodar, ctx["partidas"]
+
+
+def _offsets(ctx):
+    """Início de cada agente nas linhas do DataFrame (as partidas de cada agente são contíguas)."""
+    return np.array([f.start for f in ctx["fatias"].values()] + [len(ctx["df"])])
+
+
+def etapa_media_movel(ctx):
+    scores, offsets = ctx["df"]['score'].to_numpy(), _offsets(ctx)
+    return lambda: grouped_rolling_mean(scores, offsets, JANELA), ctx["partidas"]
+
+
+def etapa_slope(ctx):
+    offsets = _offsets(ctx)
+    media_movel = grouped_rolling_mean(ctx["df"]['score'].to_numpy(), offsets, JANELA)
+    return lambda: grouped_slopes(media_movel, offsets), ctx["partidas"]
+
+
+def etapa_leaderboard(ctx):
+    """Métricas de todos os agentes com o cache vazio, seguidas do ranking com pesos iguais."""
+    df, fatias = ctx["df"], ctx["fatias"]
+
+    def rodar():
+        df_leaderboard = montar_leaderboard(MetricasCache(), 0, df, list(fatias), JANELA, LIMIAR, fatias)
+        pesos = {m: 1.0 for m in df_leaderboard.columns if isinstance(df_leaderboard[m].iloc[0], (int, float))}
+        return ranquear(df_leaderboard, pesos)
+    return rodar, ctx["partidas"]
+
+
+def etapa_bootstrap(ctx):
+    """Reamostras bootstrap de todos os agentes com o cache vazio e as probabilidades do ranking."""
+    df, fatias = ctx["df"], ctx["fatias"]
+    df_leaderboard = montar_leaderboard(MetricasCache(), 0, df, list(fatias), JANELA, LIMIAR, fatias)
+    pesos = {m: 1.0 for m in df_leaderboard.columns if isinstance(df_leaderboard[m].iloc[0], (int, float))}
+
+    def rodar():
+        cache = MetricasCache()
+        reamostras = {a: cache.reamostras(0, a, lambda a=a: df['score'].iloc[fatias[a]]) for a in df_leaderboard.index}
+        return probabilidades_ranking(df_leaderboard, reamostras, pesos)
+    return rodar, ctx["partidas"]
+
+
+ETAPAS_JOGO = {"passos_env": etapa_passos_env, "passos_lote": etapa_passos_lote}
+ETAPAS_DADOS = {
+    "carregar_json": etapa_carregar_json,
+    "media_movel": etapa_media_movel,
+    "slope": etapa_slope,
+    "leaderboard": etapa_leaderboard,
+    "bootstrap": etapa_bootstrap,
+}
+
+
+def _medir_etapa(nome, etapa, ctx, repeticoes, memoria):
+    funcao, itens = etapa(ctx)
+    segundos, resultado = medir(funcao, repeticoes)
+    registro = {
+        "etapa": nome, "partidas": ctx.get("partidas"), "agentes": ctx.get("agentes"),
+        "segundos": segundos, "itens": itens, "itens_por_segundo": itens / segundos if segundos > 0 else None,
+        "pico_memoria_mb": pico_memoria(funcao) / 2**20 if memoria else None,
+    }
+    print(f"  {nome:<14} {segundos * 1000:>10.1f} ms  {registro['itens_por_segundo']:>14,.0f}/s"
+          + (f"  {registro['pico_memoria_mb']:>9.1f} MB" if memoria else ""))
+    return registro, resultado
+
+
+def rodar(escalas, formato="jsonl", passos=200_000, repeticoes=3, seed=0, memoria=True):
+    """Executa todas as etapas em todas as `escalas` e retorna o relatório."""
+    resultados = []
+    print(f"Jogo headless ({passos} passos)")
+    for nome, etapa in ETAPAS_JOGO.items():
+        resultados.append(_medir_etapa(nome, etapa, {"passos": passos}, repeticoes, memoria)[0])
+
+    for partidas, agentes in escalas:
+        print(f"{partidas:,} partidas, {agentes} agentes ({formato})")
+        with tempfile.TemporaryDirectory(prefix="snakalytics-bench-") as diretorio:
+            gerar_dados(diretorio, partidas, agentes, formato, seed)
+            ctx = {"diretorio": diretorio, "partidas": partidas, "agentes": agentes}
+            for nome, etapa in ETAPAS_DADOS.items():
+                registro, resultado = _medir_etapa(nome, etapa, ctx, repeticoes, memoria)
+                resultados.append(registro)
+                if nome == "carregar_json":
+                    ctx["df"], ctx["fatias"], _, _ = resultado
+
+    return {
+        "meta": {
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "numpy": np.__version__, "pandas": pd.__version__, "plataforma": platform.platform(),
+            "formato": formato, "passos": passos, "repeticoes": repeticoes, "seed": seed,
+        },
+        "resultados": resultados,
+    }
+
+
+# --- 2. COMPARAÇÃO ---
+
+def comparar(base, novo, tolerancia=0.2, minimo_ms=1.0):
+    """
+    Compara dois relatórios etapa a etapa. Uma etapa regrediu se o tempo por item ou o pico de memória cresceram
+    mais que `tolerancia` (fração); tempos abaixo de `minimo_ms` na base são ruído e só são exibidos.
+    Retorna a lista de regressões.
+    """
+    chave = lambda r: (r["etapa"], r["partidas"], r["agentes"])
+    anteriores = {chave(r): r for r in base["resultados"]}
+    regressoes = []
+    print(f"{'etapa':<14} {'partidas':>11} {'agentes':>7} {'tempo':>8} {'memória':>8}")
+    for r in novo["resultados"]:
+        b = anteriores.get(chave(r))
+        if b is None:
+            continue
+        # Compara o tempo por item, para que execuções com outro número de passos continuem comparáveis.
+        razao_tempo = (r["segundos"] / r["itens"]) / (b["segundos"] / b["itens"]) if b["segundos"] > 0 else 1.0
+        razao_memoria = (r["pico_memoria_mb"] / b["pico_memoria_mb"]
+                         if r.get("pico_memoria_mb") is not None and b.get("pico_memoria_mb") else None)
+        piorou = (b["segundos"] * 1000 >= minimo_ms and razao_tempo > 1 + tolerancia) or \
+                 (razao_memoria is not None and razao_memoria > 1 + tolerancia)
+        if piorou:
+            regressoes.append({"etapa": r["etapa"], "partidas": r["partidas"], "agentes": r["agentes"],
+                               "razao_tempo": razao_tempo, "razao_memoria": razao_memoria})
+        memoria = f"{razao_memoria:>7.2f}x" if razao_memoria is not None else f"{'-':>8}"
+        print(f"{r['etapa']:<14} {r['partidas'] if r['partidas'] is not None else '-':>11} {r['agentes'] if r['agentes'] is not None else '-':>7} "
+              f"{razao_tempo:>7.2f}x {memoria}{'  <-- REGRESSÃO' if piorou else ''}")
+    return regressoes
+
+
+def _ler_relatorio(caminho):
+    with open(caminho) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks reprodutíveis da simulação, da ingestão e dos cálculos do dashboard.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_rodar = sub.add_parser("rodar", help="Executa a suíte e grava os resultados em JSON.")
+    p_rodar.add_argument("--escala", choices=list(ESCALAS), default="rapida",
+                         help="Conjunto de (partidas, agentes): " + "; ".join(f"{k}={v}" for k, v in ESCALAS.items()))
+    p_rodar.add_argument("--partidas", type=int, nargs="+", help="Substitui a escala: totais de partidas (combinados com --agentes).")
+    p_rodar.add_argument("--agentes", type=int, nargs="+", default=[3])
+    p_rodar.add_argument("--formato", choices=["json", "jsonl"], default="jsonl", help="Formato dos arquivos gerados.")
+    p_rodar.add_argument("--passos", type=int, default=200_000, help="Passos do jogo headless.")
+    p_rodar.add_argument("--repeticoes", type=int, default=3)
+    p_rodar.add_argument("--seed", type=int, default=0)
+    p_rodar.add_argument("--sem-memoria", action="store_true", help="Não mede o pico de memória (mais rápido).")
+    p_rodar.add_argument("--saida", default="benchmark_resultados.json")
+    p_rodar.add_argument("--base", help="Relatório anterior para comparar ao fim da execução.")
+    p_rodar.add_argument("--tolerancia", type=float, default=0.2, help="Piora relativa tolerada (0.2 = 20%%).")
+    p_rodar.add_argument("--minimo-ms", type=float, default=1.0, help="Ignora regressões de tempo em etapas mais rápidas que isso.")
+    p_comparar = sub.add_parser("comparar", help="Compara dois relatórios e aponta regressões.")
+    p_comparar.add_argument("base")
+    p_comparar.add_argument("novo")
+    p_comparar.add_argument("--tolerancia", type=float, default=0.2, help="Piora relativa tolerada (0.2 = 20%%).")
+    p_comparar.add_argument("--minimo-ms", type=float, default=1.0, help="Ignora regressões de tempo em etapas mais rápidas que isso.")
+    args = parser.parse_args()
+
+    if args.comando == "rodar":
+        escalas = [(p, a) for p in args.partidas for a in args.agentes] if args.partidas else ESCALAS[args.escala]
+        relatorio = rodar(escalas, args.formato, args.passos, args.repeticoes, args.seed, not args.sem_memoria)
+        with open(args.saida, "w") as f:
+            json.dump(relatorio, f, indent=2)
+        print(f"Resultados gravados em '{args.saida}'.")
+        regressoes = comparar(_ler_relatorio(args.base), relatorio, args.tolerancia, args.minimo_ms) if args.base else []
+    else:
+        regressoes = comparar(_ler_relatorio(args.base), _ler_relatorio(args.novo), args.tolerancia, args.minimo_ms)
+    if regressoes:
+        print(f"{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}.")
+        sys.exit(1)
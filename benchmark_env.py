@@ -0,0 +1,71 @@
+import argparse
+import time
+
+from snake_env import SnakeEnv, DELTAS
+
+
+def hamiltonian_cycle(cols, rows):
+    """
+    Retorna um ciclo que passa por todas as células do tabuleiro (requer `rows` par):
+    percorre a linha 0 para a direita, desce em zigue-zague pelas colunas 1.. e volta pela coluna 0.
+    """
+    path = [(x, 0) for x in range(cols)]
+    for y in range(1, rows):
+        xs = range(cols - 1, 0, -1) if y % 2 == 1 else range(1, cols)
+        path.extend((x, y) for x in xs)
+    path.extend((0, y) for y in range(rows - 1, 0, -1))
+    return path
+
+
+def _direction(a, b):
+    return DELTAS.index((b[0] - a[0], b[1] - a[1]))
+
+
+def benchmark_env(length, steps, cols=40, rows=30):
+    """Mede o custo médio (µs) de um `SnakeEnv.step` com uma cobra de tamanho `length`."""
+    cycle = hamiltonian_cycle(cols, rows)
+    env = SnakeEnv(cols, rows, seed=0)
+    # Cabeça em cycle[length - 1], corpo seguindo o ciclo para trás.
+    body = [cycle[i] for i in range(length - 1, -1, -1)]
+    env._load_body(body, _direction(cycle[length - 2], cycle[length - 1]))
+    # Sem comida no tabuleiro o tamanho fica fixo durante toda a medição.
+    env.food_pos = None
+
+    actions = [_direction(cycle[i], cycle[(i + 1) % len(cycle)]) for i in range(len(cycle))]
+    pos = length - 1
+    start = time.perf_counter()
+    for _ in range(steps):
+        env.step(actions[pos])
+        pos = (pos + 1) % len(cycle)
+    assert not env.game_over and len(env.snake_body) == length
+    return (time.perf_counter() - start) / steps * 1e6
+
+
+def benchmark_legacy(length, steps, cols=40, rows=30):
+    """Mesmo cenário com a lógica original de run_game (lista com insert/pop e busca em body[1:])."""
+    cycle = hamiltonian_cycle(cols, rows)
+    body = [list(cycle[i]) for i in range(length - 1, -1, -1)]
+    pos = length - 1
+    start = time.perf_counter()
+    for _ in range(steps):
+        nxt = cycle[(pos + 1) % len(cycle)]
+        snake_pos = [nxt[0], nxt[1]]
+        body.insert(0, list(snake_pos))
+        body.pop()
+        if snake_pos[0] < 0 or snake_pos[0] >= cols or snake_pos[1] < 0 or snake_pos[1] >= rows or body[0] in body[1:]:
+            raise AssertionError("a cobra não deveria colidir seguindo o ciclo")
+        pos = (pos + 1) % len(cycle)
+    return (time.perf_counter() - start) / steps * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark do custo de um passo do jogo em função do tamanho da cobra.")
+    parser.add_argument("--steps", type=int, default=20000, help="Passos medidos por tamanho de cobra.")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[3, 50, 200, 600, 1100])
+    args = parser.parse_args()
+
+    print(f"{'Tamanho':>8} | {'SnakeEnv (µs/passo)':>20} | {'Lógica original (µs/passo)':>27}")
+    for length in args.lengths:
+        atual = benchmark_env(length, args.steps)
+        original = benchmark_legacy(length, args.steps)
+        print(f"{length:>8} | {atual:>20.3f} | {original:>27.3f}")
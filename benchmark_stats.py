@@ -0,0 +1,104 @@
+import argparse
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from stats_math import grouped_rolling_mean, grouped_rolling_std, grouped_slopes
+
+
+def slope_sklearn(series):
+    """O cálculo original de calcular_slope, com um LinearRegression por agente."""
+    from sklearn.linear_model import LinearRegression
+
+    y = series.dropna().values.reshape(-1, 1)
+    if len(y) < 2:
+        return 0
+    x = np.array(series.dropna().index).reshape(-1, 1)
+    model = LinearRegression()
+    model.fit(x, y)
+    return model.coef_[0][0]
+
+
+def caminho_sklearn(df, janela):
+    """Caminho original do leaderboard: filtro booleano, média móvel do pandas e regressão por agente."""
+    slopes = {}
+    for agente in df['agent'].unique():
+        df_agente = df[df['agent'] == agente].copy().reset_index(drop=True)
+        media_movel = df_agente['score'].rolling(window=janela, min_periods=1).mean()
+        slopes[agente] = slope_sklearn(media_movel)
+    return slopes
+
+
+def caminho_numpy(df, janela):
+    """Mesmo resultado com stats_math: uma passada agrupada para todos os agentes."""
+    codigos = df['agent'].cat.codes.to_numpy()
+    inicios = np.concatenate(([0], np.flatnonzero(codigos[1:] != codigos[:-1]) + 1))
+    offsets = np.append(inicios, len(codigos))
+    medias_moveis = grouped_rolling_mean(df['score'].to_numpy(), offsets, janela)
+    slopes = grouped_slopes(medias_moveis, offsets)
+    return dict(zip(df['agent'].cat.categories[codigos[inicios]], slopes))
+
+
+def verificar_contra_pandas(janelas=(1, 7, 100)):
+    """
+    Confere grouped_rolling_mean e grouped_rolling_std com o `rolling(min_periods=1)` do pandas por agente,
+    com pontuações ausentes (NaN) espalhadas, no início de um agente e em um trecho maior que a janela.
+    """
+    rng = np.random.default_rng(1)
+    offsets = np.array([0, 300, 301, 1_000])
+    valores = rng.integers(0, 30, offsets[-1]).astype(np.float64)
+    valores[rng.random(len(valores)) < 0.1] = np.nan
+    valores[[0, 300]] = np.nan
+    valores[500:620] = np.nan
+    for janela in janelas:
+        for funcao, metodo in ((grouped_rolling_mean, "mean"), (grouped_rolling_std, "std")):
+            esperado = np.concatenate([
+                getattr(pd.Series(valores[inicio:fim]).rolling(janela, min_periods=1), metodo)()
+                for inicio, fim in zip(offsets[:-1], offsets[1:])
+            ])
+            assert np.allclose(funcao(valores, offsets, janela), esperado, equal_nan=True), (funcao.__name__, janela)
+
+
+def medir(funcao, *args, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def tempo_de_import(modulo):
+    """Tempo (s) para importar `modulo` em um interpretador novo."""
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {modulo}"], check=True)
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara o cálculo de slope/média móvel do sklearn com a versão vetorizada em NumPy.")
+    parser.add_argument("--linhas", type=int, default=1_000_000, help="Partidas por agente.")
+    parser.add_argument("--agentes", type=int, default=3)
+    parser.add_argument("--janela", type=int, default=100)
+    args = parser.parse_args()
+
+    verificar_contra_pandas()
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "score": np.concatenate([rng.integers(0, 5 + np.arange(args.linhas) // 50 + a) for a in range(args.agentes)]),
+        "agent": pd.Categorical(np.repeat([f"agente_{a}" for a in range(args.agentes)], args.linhas)),
+    })
+
+    t_sklearn, slopes_sklearn = medir(caminho_sklearn, df, args.janela)
+    t_numpy, slopes_numpy = medir(caminho_numpy, df, args.janela)
+    for agente, slope in slopes_sklearn.items():
+        assert np.isclose(slope, slopes_numpy[agente]), (agente, slope, slopes_numpy[agente])
+
+    print(f"{args.agentes} agentes x {args.linhas} partidas, janela {args.janela}")
+    print(f"  sklearn por agente : {t_sklearn * 1000:10.1f} ms")
+    print(f"  NumPy agrupado     : {t_numpy * 1000:10.1f} ms  ({t_sklearn / t_numpy:.1f}x mais rápido)")
+    print(f"  import sklearn.linear_model: {tempo_de_import('sklearn.linear_model'):.2f}s | import stats_math: {tempo_de_import('stats_math'):.2f}s")
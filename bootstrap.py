@@ -0,0 +1,98 @@
+import numpy as np
+from joblib import Parallel, delayed
+
+# Bootstrap das métricas de um agente (média, desvio padrão e slope das pontuações contra o número
+# da partida), com custo que não cresce com o número de partidas.
+#
+# As partidas são agrupadas em células (bloco de partidas consecutivas, pontuação): como as pontuações
+# são inteiros pequenos, há bem menos células do que partidas. Cada célula guarda as somas exatas
+# [n, Σy, Σy², Σx, Σx², Σxy] das suas partidas. Uma reamostra é um bootstrap de Poisson: cada partida
+# entra Poisson(1) vezes, então cada célula com c partidas recebe um peso Poisson(c), e as somas da
+# reamostra saem de um único produto de matrizes (pesos das reamostras × somas das células).
+# Com a mesma pontuação e o mesmo bloco, as partidas de uma célula só diferem no índice x, cuja
+# variação dentro de um bloco é desprezível perto da variação entre os blocos (1/blocos² dela).
+# Pelo mesmo motivo, pontuações muito espalhadas são agrupadas em até MAX_FAIXAS faixas de mesma
+# largura: as somas continuam exatas e só a variação dentro de cada faixa deixa de ser sorteada.
+
+N_REAMOSTRAS = 1000
+# Número de blocos: o suficiente para ficar perto de MAX_CELULAS células, entre MIN_BLOCOS e MAX_BLOCOS.
+MAX_CELULAS = 5_000
+MIN_BLOCOS, MAX_BLOCOS = 20, 100
+MAX_FAIXAS = 250
+# Reamostras geradas por tarefa; cada lote tem a sua própria seed derivada da seed principal.
+REAMOSTRAS_POR_LOTE = 50
+# Abaixo deste trabalho (reamostras × células), distribuir os lotes entre threads custa mais do que ganha.
+MIN_TRABALHO_PARALELO = 5_000_000
+
+
+def somas_por_celula(scores, max_celulas=MAX_CELULAS):
+    """
+    Retorna (contagens, somas): o número de partidas de cada célula (bloco, faixa de pontuação) e as somas
+    [n, Σy, Σy², Σx, Σx², Σxy] das suas partidas, com x = índice da partida centrado na média.
+    Pontuações ausentes (NaN) são ignoradas.
+    """
+    y = np.asarray(scores)
+    if np.issubdtype(y.dtype, np.floating):
+        y = y[~np.isnan(y)]
+    y = y.astype(np.int64)
+    n = len(y)
+    if n == 0:
+        return np.zeros(0), np.zeros((0, 6))
+    minimo = int(y.min())
+    largura = -(-(int(y.max()) - minimo + 1) // MAX_FAIXAS)
+    faixas = (int(y.max()) - minimo) // largura + 1
+    blocos = min(MAX_BLOCOS, max(MIN_BLOCOS, max_celulas // faixas))
+    tamanho_bloco = -(-n // blocos)
+    chave = np.arange(n) // tamanho_bloco * faixas + (y - minimo) // largura
+    x = np.arange(n, dtype=np.float64) - (n - 1) / 2.0
+    y = y.astype(np.float64)
+    colunas = (None, y, y * y, x, x * x, x * y)
+    # Somas indexadas direto pela chave (no máximo MAX_BLOCOS × MAX_FAIXAS); só as chaves com partidas viram células.
+    somas = [np.bincount(chave, weights=c) for c in colunas]
+    chaves = np.flatnonzero(somas[0])
+    somas = np.stack([s[chaves] for s in somas], axis=1)
+    return somas[:, 0], somas
+
+
+def metricas_das_somas(somas):
+    """Média, desvio padrão (ddof=1) e slope para cada linha de somas (..., 6)."""
+    n, sy, syy, sx, sxx, sxy = np.moveaxis(np.asarray(somas, dtype=np.float64), -1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media = sy / n
+        desvio = np.sqrt(np.maximum(syy - sy * media, 0.0) / (n - 1))
+        sxx_centrado = sxx - sx * sx / n
+        slope = np.where(sxx_centrado > 0, (sxy - sx * sy / n) / sxx_centrado, 0.0)
+    return np.stack([media, desvio, slope], axis=-1)
+
+
+def _reamostrar_lote(contagens, somas, n_reamostras, seed):
+    rng = np.random.default_rng(seed)
+    # Uma linha de pesos por reamostra; cada célula contribui com a fração peso/contagem das suas somas.
+    pesos = rng.poisson(contagens, size=(n_reamostras, len(contagens)))
+    return metricas_das_somas((pesos / contagens) @ somas)
+
+
+def reamostrar(scores, n_reamostras=N_REAMOSTRAS, seed=None, n_jobs=-1, max_celulas=MAX_CELULAS):
+    """
+    Matriz (n_reamostras, 3) com média, desvio padrão e slope de cada reamostra bootstrap das partidas.
+    Os lotes de reamostras são distribuídos entre os núcleos com joblib quando o trabalho compensa
+    (o NumPy libera o GIL ao sortear e multiplicar matrizes); com a mesma seed, o resultado não
+    depende de `n_jobs`.
+    """
+    contagens, somas = somas_por_celula(scores, max_celulas)
+    if len(contagens) == 0:
+        return np.full((n_reamostras, 3), np.nan)
+    lotes = [min(REAMOSTRAS_POR_LOTE, n_reamostras - i) for i in range(0, n_reamostras, REAMOSTRAS_POR_LOTE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(lotes))
+    if n_jobs == 1 or n_reamostras * len(contagens) < MIN_TRABALHO_PARALELO:
+        partes = [_reamostrar_lote(contagens, somas, n, s) for n, s in zip(lotes, seeds)]
+    else:
+        tarefas = (delayed(_reamostrar_lote)(contagens, somas, n, s) for n, s in zip(lotes, seeds))
+        partes = Parallel(n_jobs=n_jobs, prefer="threads")(tarefas)
+    return np.concatenate(partes)
+
+
+def intervalo(reamostras, nivel=0.95):
+    """Intervalo percentil (inferior, superior) de cada coluna das reamostras."""
+    alfa = (1 - nivel) / 2
+    return np.nanquantile(reamostras, [alfa, 1 - alfa], axis=0)
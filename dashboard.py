@@ -2,95 +2,151 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import glob
-from sklearn.linear_model import LinearRegression
+import altair as alt
 import numpy as np
 
-# Função de normalização segura para evitar divisão por zero.
-def safe_normalize(series):
-    """Normalizes a pandas Series, handling the case where max equals min."""
-    min_val = series.min()
-    max_val = series.max()
-    if max_val == min_val:
-        # Se todos os valores são iguais, retorna 0.5 (neutro) para todos.
-        return pd.Series([0.5] * len(series), index=series.index)
-    return (series - min_val) / (max_val - min_val)
+from distribuicao import DistribuicoesCache
+from downsample import METODOS as METODOS_REDUCAO, reduzir
+from incremental_loader import IncrementalLoader
+from profiling import Perfil
+from leaderboard import MetricasCache, intervalos_confianca, montar_leaderboard, probabilidades_ranking, ranquear
+from stats_math import group_offsets, grouped_rolling_mean
+from stats_parquet import DIRETORIO_PADRAO as DIRETORIO_PARQUET, carregar_dataset, listar_agentes, versao_dataset
 
-
-def calcular_slope(series):
-    """Calcula o coeficiente angular (slope) de uma série de dados usando regressão linear."""
-    y = series.dropna().values.reshape(-1, 1)
-    if len(y) < 2:
-        return 0
-    x = np.array(series.dropna().index).reshape(-1, 1)
-    
-    model = LinearRegression()
-    model.fit(x, y)
-    return model.coef_[0][0]
+# Pontos por curva no gráfico de aprendizado: a largura da figura (12 polegadas a 100 dpi) em pixels.
+PONTOS_POR_CURVA = 1200
+# Intervalo (s) entre as verificações de partidas novas no modo ao vivo.
+INTERVALO_AO_VIVO = 2.0
+# Nível dos intervalos de confiança bootstrap do leaderboard.
+NIVEL_CONFIANCA = 0.95
 
 st.set_page_config(
     page_title="Dashboard de Análise Comparativa - IA Snake",
     layout="wide"
 )
 
-@st.cache_data
-def load_all_data(padrao_arquivo="stats_*.json"):
+@st.cache_resource
+def get_loader(padroes_arquivo=("stats_*.json", "stats_*.jsonl")):
     """
-    Encontra todos os arquivos JSON que correspondem ao padrão, os carrega
-    e os combina em um único DataFrame com uma coluna 'agent'.
+    Cria (uma única vez por processo) o carregador incremental dos arquivos de estatísticas.
+    A cada execução do script ele relê apenas as partidas novas, em vez de todo o histórico.
     """
-    lista_arquivos = glob.glob(padrao_arquivo)
-    if not lista_arquivos:
-        return None
-    
-    lista_dfs = []
-    for arquivo in lista_arquivos:
-        try:
-            df_temp = pd.read_json(arquivo)
-            if not df_temp.empty:
-                nome_agente = arquivo.replace("stats_", "").replace(".json", "").replace("\\", "/").split("/")[-1]
-                df_temp['agent'] = nome_agente
-                lista_dfs.append(df_temp)
-        except (ValueError, FileNotFoundError):
-            # Ignora arquivos JSON corrompidos ou vazios
-            st.warning(f"Não foi possível carregar o arquivo: {arquivo}. Ele pode estar vazio ou mal formatado.")
-            continue
-            
-    if not lista_dfs:
-        return None
-        
-    df_completo = pd.concat(lista_dfs, ignore_index=True)
-    return df_completo
+    return IncrementalLoader(padroes_arquivo)
+
+def load_all_data():
+    """
+    Retorna (df, fatias, versao, geracoes): o DataFrame combinado de todos os arquivos de estatísticas
+    (arrays JSON legados ou logs JSON Lines), com as partidas de cada agente contíguas, o intervalo de
+    linhas de cada agente e a versão e as gerações desses mesmos dados (ver IncrementalLoader.dados).
+    Incorpora só o que mudou desde a última execução.
+    """
+    loader = get_loader()
+    loader.atualizar()
+    for arquivo in loader.erros:
+        # Ignora arquivos JSON corrompidos ou vazios
+        st.warning(f"Não foi possível carregar o arquivo: {arquivo}. Ele pode estar vazio ou mal formatado.")
+    return loader.dados
+
+def calcular_fatias(df):
+    """
+    Retorna (df, fatias): o DataFrame com as partidas de cada agente contíguas e o intervalo de linhas
+    (slice) de cada agente. Se as partidas de algum agente vierem intercaladas, as linhas são reordenadas
+    por agente (de forma estável, mantendo a ordem das partidas de cada um).
+    """
+    ordem, offsets, grupos = group_offsets(df['agent'].cat.codes.to_numpy())
+    if ordem is not None:
+        df = df.take(ordem).reset_index(drop=True)
+    categorias = df['agent'].cat.categories
+    return df, {categorias[codigo]: slice(int(offsets[g]), int(offsets[g + 1])) for g, codigo in enumerate(grupos)}
+
+@st.cache_resource(max_entries=8)
+def load_parquet_data(agentes, versao, diretorio=DIRETORIO_PARQUET):
+    """
+    Carrega apenas as partições dos agentes selecionados do dataset Parquet
+    (gerado com `python stats_parquet.py`) e retorna (df, fatias).
+    `versao` (de versao_dataset) faz parte da chave do cache: uma nova ingestão gera outra versão e
+    os dados são relidos em vez de servidos do cache. O resultado é compartilhado sem cópia entre
+    execuções, então não deve ser modificado.
+    """
+    return calcular_fatias(carregar_dataset(diretorio, agentes=list(agentes)))
+
+@st.fragment(run_every=INTERVALO_AO_VIVO)
+def acompanhar_novas_partidas():
+    """
+    Modo ao vivo: a cada INTERVALO_AO_VIVO segundos, incorpora as partidas novas sem bloquear a sessão
+    e só executa o script inteiro de novo quando os dados mudaram.
+    """
+    if get_loader().atualizar():
+        st.rerun()
+
+@st.cache_resource
+def get_metricas_cache():
+    """Cache das métricas do leaderboard, compartilhado entre execuções do script e indexado pela versão dos dados."""
+    return MetricasCache()
+
+@st.cache_resource
+def get_distribuicoes_cache():
+    """Contagens de pontuações por agente, atualizadas só com as partidas novas a cada versão dos dados."""
+    return DistribuicoesCache()
 
 st.title("🐍 Dashboard de Análise Comparativa de Agentes - Snake")
 
-df_total = load_all_data()
+# Medição opcional do tempo de cada etapa (painel "Performance" na barra lateral), separada por sessão.
+perfil = st.session_state.setdefault("perfil", Perfil())
+perfil.ativo = st.session_state.get("perfil_ativo", False)
+inicio_execucao = perfil.marcar()
+
+# Com um dataset Parquet disponível, a lista de agentes vem das partições e só os selecionados são lidos.
+usar_parquet = bool(listar_agentes(DIRETORIO_PARQUET))
+if usar_parquet:
+    lista_agentes = listar_agentes(DIRETORIO_PARQUET)
+    df_total = None
+else:
+    with perfil.secao("dashboard.carregar_dados"):
+        # A versão e as gerações vêm junto com o DataFrame: outra sessão pode atualizar o carregador
+        # compartilhado a qualquer momento, e os caches não podem guardar dados antigos sob a versão nova.
+        df_total, fatias_total, versao_dados, geracoes = load_all_data()
+    lista_agentes = list(fatias_total)
 
-if df_total is None:
-    st.error("Nenhum arquivo de estatísticas ('stats_*.json') foi encontrado. Por favor, gere os dados primeiro.")
+if not len(lista_agentes):
+    st.error("Nenhum arquivo de estatísticas ('stats_*.json' ou 'stats_*.jsonl') foi encontrado. Por favor, gere os dados primeiro.")
 else:
     st.sidebar.header("Filtros e Controles")
+    if usar_parquet:
+        st.sidebar.caption(f"Fonte dos dados: dataset Parquet '{DIRETORIO_PARQUET}'.")
+        acompanhar_ao_vivo = False
+    else:
+        acompanhar_ao_vivo = st.sidebar.toggle(
+            "Acompanhar novas partidas (ao vivo)",
+            help="Atualiza o dashboard automaticamente quando novas partidas são gravadas nos arquivos de estatísticas."
+        )
     
-    lista_agentes = df_total['agent'].unique()
     agentes_selecionados = st.sidebar.multiselect(
         "Selecione os agentes para comparar:",
         options=lista_agentes,
         default=list(lista_agentes)
     )
     
-    if agentes_selecionados:
-        df_filtrado = df_total[df_total['agent'].isin(agentes_selecionados)]
-        # Criar uma cópia explícita para evitar o SettingWithCopyWarning.
-        df_filtrado = df_filtrado.copy()
-    else:
-        df_filtrado = df_total.iloc[0:0]
+    if usar_parquet:
+        versao_dados = versao_dataset(DIRETORIO_PARQUET)
+        with perfil.secao("dashboard.carregar_dados"):
+            df_total, fatias_total = load_parquet_data(tuple(agentes_selecionados), versao_dados)
+    # As partidas de cada agente são um intervalo contíguo de linhas: os agentes selecionados são
+    # acessados por fatias, sem filtrar nem copiar o DataFrame.
+    fatias = {agente: fatias_total[agente] for agente in agentes_selecionados if agente in fatias_total}
+    scores_do_agente = lambda agente: df_total['score'].iloc[fatias[agente]]
+    # No dataset Parquet uma partição é sempre reescrita por inteiro, então qualquer mudança refaz as contagens.
+    geracao_dados = (lambda agente: versao_dados) if usar_parquet else (lambda agente: geracoes.get(agente, 0))
+    metricas_cache = get_metricas_cache()
 
     janela_media_movel = st.sidebar.number_input(
         "Janela da Média Móvel (partidas):",
         min_value=1, max_value=1000, value=100
     )
 
-    max_score_geral = int(df_filtrado['score'].max()) if not df_filtrado.empty else 20
+    # Pontuações ausentes (NaN) são ignoradas; agentes sem nenhuma pontuação válida não entram no máximo.
+    maximos = [np.nanmax(scores) for scores in (scores_do_agente(agente).to_numpy() for agente in fatias) if np.isfinite(scores).any()]
+    max_score_geral = int(max(maximos)) if maximos else 20
     # Garante que o valor padrão do slider esteja sempre dentro do intervalo [min_value, max_value].
     default_slider_value = max(1, min(10, max_score_geral))
     score_threshold = st.sidebar.slider(
@@ -102,11 +158,11 @@ else:
 
     st.header("Análise Comparativa de Desempenho")
 
-    if not df_filtrado.empty and agentes_selecionados:
-        cols = st.columns(len(agentes_selecionados))
-        for i, agente in enumerate(agentes_selecionados):
-            df_agente = df_filtrado[df_filtrado['agent'] == agente]
-            pontuacao_media = df_agente['score'].mean()
+    if fatias:
+        cols = st.columns(len(fatias))
+        for i, agente in enumerate(fatias):
+            with perfil.secao("dashboard.media_agente"):
+                pontuacao_media, _ = metricas_cache.agregados(versao_dados, agente, lambda: scores_do_agente(agente))
             with cols[i]:
                 st.metric(label=f"Pontuação Média ({agente})", value=f"{pontuacao_media:.2f}")
 
@@ -114,33 +170,87 @@ else:
 
     with tab1:
         st.subheader("Evolução da Pontuação Média ao Longo do Tempo")
-        if not df_filtrado.empty:
-            fig1, ax1 = plt.subplots(figsize=(12, 6))
-            
-            df_filtrado['media_movel_score'] = df_filtrado.groupby('agent')['score'].rolling(window=janela_media_movel, min_periods=1).mean().reset_index(level=0, drop=True)
+        if fatias:
+            # Média móvel de todos os agentes em uma única passada vetorizada (somas acumuladas por grupo).
+            with perfil.secao("dashboard.media_movel"):
+                offsets = np.cumsum([0] + [f.stop - f.start for f in fatias.values()])
+                scores = np.concatenate([scores_do_agente(agente).to_numpy() for agente in fatias])
+                media_movel = grouped_rolling_mean(scores, offsets, janela_media_movel)
+
+            col_metodo, col_modo = st.columns(2)
+            metodo_reducao = col_metodo.selectbox(
+                "Redução de pontos:", options=list(METODOS_REDUCAO.keys()),
+                help="Cada curva é reduzida à quantidade de pontos que cabe na largura do gráfico, preservando o seu formato."
+            )
+            modo_interativo = col_modo.toggle("Gráfico interativo (Altair)")
 
-            sns.lineplot(data=df_filtrado, x=df_filtrado.index, y='media_movel_score', hue='agent', ax=ax1)
-            ax1.set_title(f'Comparativo de Curvas de Aprendizado (Média Móvel de {janela_media_movel} Partidas)')
-            ax1.set_xlabel('Número da Partida (Índice Global)')
-            ax1.set_ylabel('Pontuação Média Móvel')
-            st.pyplot(fig1)
+            # Reduz a curva de cada agente ao orçamento de pixels antes de desenhar.
+            inicio_curvas = perfil.marcar()
+            curvas_reduzidas = []
+            for g, (agente, fatia) in enumerate(fatias.items()):
+                x_global = np.arange(fatia.start, fatia.stop)
+                x_reduzido, y_reduzido = reduzir(x_global, media_movel[offsets[g]:offsets[g + 1]], PONTOS_POR_CURVA, metodo_reducao)
+                curvas_reduzidas.append(pd.DataFrame({"partida": x_reduzido, "media_movel_score": y_reduzido, "agent": agente}))
+            df_curvas = pd.concat(curvas_reduzidas, ignore_index=True)
+
+            titulo_curvas = f'Comparativo de Curvas de Aprendizado (Média Móvel de {janela_media_movel} Partidas)'
+            if modo_interativo:
+                grafico = alt.Chart(df_curvas, title=titulo_curvas).mark_line().encode(
+                    x=alt.X('partida:Q', title='Número da Partida (Índice Global)'),
+                    y=alt.Y('media_movel_score:Q', title='Pontuação Média Móvel'),
+                    color=alt.Color('agent:N', title='agent'),
+                    tooltip=['agent', 'partida', alt.Tooltip('media_movel_score:Q', format='.2f')]
+                ).interactive()
+                st.altair_chart(grafico, use_container_width=True)
+            else:
+                fig1, ax1 = plt.subplots(figsize=(12, 6))
+                sns.lineplot(data=df_curvas, x='partida', y='media_movel_score', hue='agent', ax=ax1)
+                ax1.set_title(titulo_curvas)
+                ax1.set_xlabel('Número da Partida (Índice Global)')
+                ax1.set_ylabel('Pontuação Média Móvel')
+                st.pyplot(fig1)
+            perfil.registrar_desde("dashboard.grafico_curvas", inicio_curvas)
+            st.caption(f"{len(df_curvas):,} pontos desenhados de {offsets[-1]:,} partidas.")
         else:
             st.warning("Selecione pelo menos um agente para visualizar a curva de aprendizado.")
 
     with tab2:
         st.subheader("Comparativo da Distribuição das Pontuações Finais")
-        if not df_filtrado.empty:
+        if fatias:
+            # Box plot, histograma e KDE são desenhados a partir das contagens de cada pontuação.
+            inicio_distribuicao = perfil.marcar()
+            distribuicoes_cache = get_distribuicoes_cache()
+            distribuicoes, agentes_tab2 = [], []
+            for agente in fatias:
+                distribuicao = distribuicoes_cache.distribuicao(
+                    versao_dados, geracao_dados(agente), agente, lambda agente=agente: scores_do_agente(agente).to_numpy()
+                )
+                if distribuicao.n:
+                    distribuicoes.append(distribuicao)
+                    agentes_tab2.append(agente)
+            cores = sns.color_palette(n_colors=len(agentes_tab2))
+
             fig2, (ax_box, ax_hist) = plt.subplots(1, 2, figsize=(16, 6))
-            sns.boxplot(data=df_filtrado, x='agent', y='score', ax=ax_box)
+            caixas = ax_box.bxp([d.estatisticas_box(a) for a, d in zip(agentes_tab2, distribuicoes)], widths=0.6, patch_artist=True, medianprops={'color': 'black'})
+            for caixa, cor in zip(caixas['boxes'], cores):
+                caixa.set_facecolor(cor)
             ax_box.set_title('Resumo Estatístico (Box Plot)')
             ax_box.set_xlabel('Agente')
             ax_box.set_ylabel('Pontuação Final')
-            sns.histplot(data=df_filtrado, x='score', hue='agent', kde=True, element="step", ax=ax_hist)
+            for agente, distribuicao, cor in zip(agentes_tab2, distribuicoes, cores):
+                bordas = np.arange(len(distribuicao.contagens) + 1) - 0.5
+                ax_hist.stairs(distribuicao.contagens, bordas, color=cor, label=agente)
+                grade = np.linspace(bordas[0], bordas[-1], 200)
+                densidade = distribuicao.kde(grade)
+                if densidade is not None:
+                    ax_hist.plot(grade, densidade, color=cor)
+            ax_hist.legend(title='agent')
             ax_hist.set_title('Frequência das Pontuações (Histograma)')
             ax_hist.set_xlabel('Pontuação Final')
             ax_hist.set_ylabel('Frequência')
             plt.tight_layout()
             st.pyplot(fig2)
+            perfil.registrar_desde("dashboard.distribuicao", inicio_distribuicao)
             st.markdown("""
             **Como ler estes gráficos:**
             - O **Box Plot** resume a distribuição: a linha no meio da caixa é a **mediana**, a caixa representa 50% das partidas, e os pontos fora das "antenas" são partidas excepcionais (*outliers*).
@@ -150,34 +260,13 @@ else:
             st.warning("Selecione pelo menos um agente para visualizar as distribuições.")
 
     with tab3:
-        if not df_filtrado.empty and 'agent' in df_filtrado.columns and len(agentes_selecionados) > 1:
-            leaderboard_data = []
+        if len(fatias) > 1:
+            # As métricas por agente vêm do cache; só são calculadas quando os dados, a janela ou o limiar mudam.
+            with perfil.secao("dashboard.leaderboard"):
+                df_leaderboard = montar_leaderboard(metricas_cache, versao_dados, df_total, list(fatias), janela_media_movel, score_threshold, fatias)
             
-            for agente in agentes_selecionados:
-                df_agente = df_filtrado[df_filtrado['agent'] == agente].copy().reset_index(drop=True)
-                if not df_agente.empty:
-                    metricas_agente = {"Agente": agente}
-                    pontuacao_media = df_agente['score'].mean()
-                    metricas_agente["Pontuação Média"] = pontuacao_media
-                    metricas_agente["Consistência (Desvio Padrão)"] = df_agente['score'].std()
-                    media_movel_series = df_agente['score'].rolling(window=janela_media_movel, min_periods=1).mean()
-                    metricas_agente["Taxa de Aprendizado (Slope)"] = calcular_slope(media_movel_series)
-                    
-                    indices_acima = media_movel_series.index[media_movel_series >= score_threshold]
-                    atingiu_limiar = len(indices_acima) > 0
-                    metricas_agente[f"Atingiu Limiar de {score_threshold} Pontos?"] = "✅ Sim" if atingiu_limiar else "❌ Não"
-                    
-                    if atingiu_limiar:
-                        partidas_para_atingir = indices_acima[0]
-                        metricas_agente["Custo por Ponto (Partidas/Score)"] = partidas_para_atingir / pontuacao_media if pontuacao_media > 0 else float('inf')
-                    else:
-                        metricas_agente["Custo por Ponto (Partidas/Score)"] = float('inf')
-                    
-                    leaderboard_data.append(metricas_agente)
-            
-            if leaderboard_data:
+            if df_leaderboard is not None:
                 st.subheader("Tabela de Métricas Detalhadas")
-                df_leaderboard = pd.DataFrame(leaderboard_data).set_index("Agente")
                 
                 formatters = { "Pontuação Média": "{:.2f}", "Consistência (Desvio Padrão)": "{:.2f}", "Taxa de Aprendizado (Slope)": "{:.4f}", "Custo por Ponto (Partidas/Score)": "{:.2f}" }
                 st.dataframe(df_leaderboard.style.format(formatters, na_rep="N/A"))
@@ -197,29 +286,16 @@ else:
                 preset_selecionado = st.selectbox("Selecione uma Estratégia de Ranking (Preset):", options=list(presets.keys()))
                 st.info(f"**Estratégia '{preset_selecionado}':** {preset_descriptions[preset_selecionado]}")
 
-                df_rank = df_leaderboard.copy()
-                for col in df_rank.columns: 
-                    if df_rank[col].dtype == 'object':
-                        df_rank[col] = pd.to_numeric(df_rank[col], errors='coerce')
-
-                df_normalized = df_rank.apply(safe_normalize, axis=0)
+                with perfil.secao("dashboard.ranking"):
+                    df_ranked_final = ranquear(df_leaderboard, presets[preset_selecionado])
 
-                metricas_menor_melhor = ["Consistência (Desvio Padrão)", "Custo por Ponto (Partidas/Score)"]
-                for col in metricas_menor_melhor:
-                    if col in df_normalized.columns:
-                        df_normalized[col] = 1.0 - df_normalized[col]
-                
-                df_normalized = df_normalized.fillna(0)
-                
-                pesos = presets[preset_selecionado]
-                df_normalized['SCORE_FINAL'] = sum(df_normalized[metrica] * pesos.get(metrica, 0) for metrica in df_normalized.columns if metrica != 'SCORE_FINAL')
-                
-                score_min, score_max = df_normalized['SCORE_FINAL'].min(), df_normalized['SCORE_FINAL'].max()
-                if score_max - score_min > 0:
-                    df_normalized['SCORE_FINAL'] = 100 * (df_normalized['SCORE_FINAL'] - score_min) / (score_max - score_min)
-                else:
-                    df_normalized['SCORE_FINAL'] = 100.0
-                df_ranked_final = df_normalized.sort_values(by="SCORE_FINAL", ascending=False)
+                # Incerteza do ranking: as reamostras bootstrap ficam no cache até os dados mudarem.
+                with perfil.secao("dashboard.bootstrap"):
+                    reamostras = {
+                        agente: metricas_cache.reamostras(versao_dados, agente, lambda agente=agente: scores_do_agente(agente))
+                        for agente in df_leaderboard.index
+                    }
+                    probabilidades = probabilidades_ranking(df_leaderboard, reamostras, presets[preset_selecionado])
                 
                 st.markdown("---")
                 st.subheader(f"Classificação Final:")
@@ -249,8 +325,52 @@ else:
                         value = custo_display,
                         help="Mede a eficiência do agente (Partidas até o limiar / Pontuação Média). Um custo menor indica que o agente é mais eficiente para atingir sua performance."
                     )
+                    if i + 1 < len(df_ranked_final):
+                        proximo = df_ranked_final.index[i + 1]
+                        probabilidade = probabilidades.loc[agente, proximo]
+                        veredito = "diferença significativa" if probabilidade >= NIVEL_CONFIANCA else "empate técnico"
+                        st.caption(f"Fica à frente de **{proximo}** em {probabilidade:.0%} das reamostras bootstrap ({veredito}).")
+
+                with st.expander(f"Incerteza das métricas (bootstrap, IC de {NIVEL_CONFIANCA:.0%})"):
+                    df_ic = intervalos_confianca(df_leaderboard, reamostras, NIVEL_CONFIANCA)
+                    casas = {"Slope (pontuações brutas)": 4}
+                    st.dataframe(pd.DataFrame({
+                        metrica: [f"{inf:.{casas.get(metrica, 2)}f} – {sup:.{casas.get(metrica, 2)}f}" for inf, sup in zip(df_ic[(metrica, "inferior")], df_ic[(metrica, "superior")])]
+                        for metrica in df_ic.columns.get_level_values(0).unique()
+                    }, index=df_ic.index))
+                    st.markdown("**Probabilidade de o agente da linha ficar à frente do agente da coluna** (estratégia selecionada):")
+                    st.dataframe(probabilidades.loc[df_ranked_final.index, df_ranked_final.index].style.format("{:.0%}", na_rep="—"))
+                    st.caption(
+                        "As partidas de cada agente são reamostradas com reposição e as métricas e o ranking são recalculados em cada reamostra. "
+                        "O custo por ponto varia só com a média: as partidas até o limiar são as da amostra original. "
+                        "O slope reamostrado é o das pontuações brutas (não o da média móvel do leaderboard) e é ele que "
+                        "entra no lugar da taxa de aprendizado nas probabilidades do ranking."
+                    )
         else:
             st.info("Selecione pelo menos dois agentes para gerar o ranking final.")
             
     if st.checkbox("Mostrar dados brutos"):
-        st.dataframe(df_filtrado)
\ No newline at end of file
+        # Só aqui as linhas dos agentes selecionados são reunidas em um novo DataFrame.
+        st.dataframe(df_total.iloc[np.concatenate([np.arange(f.start, f.stop) for f in fatias.values()])] if fatias else df_total.iloc[0:0])
+
+    # --- Painel de desempenho ---
+    perfil.registrar_desde("dashboard.execucao", inicio_execucao)
+    with st.sidebar.expander("Performance"):
+        st.toggle(
+            "Medir tempo das etapas", key="perfil_ativo",
+            help="Registra a duração de cada etapa do dashboard a cada execução. Desligado, não há custo."
+        )
+        resumo_perfil = perfil.resumo()
+        if resumo_perfil:
+            st.dataframe(pd.DataFrame(resumo_perfil).set_index("secao").round(2))
+            col_csv, col_json, col_limpar = st.columns(3)
+            col_csv.download_button("CSV", perfil.para_csv(), file_name="perfil_dashboard.csv", mime="text/csv")
+            col_json.download_button("JSON", perfil.para_json(), file_name="perfil_dashboard.json", mime="application/json")
+            if col_limpar.button("Limpar"):
+                perfil.limpar()
+                st.rerun()
+        elif perfil.ativo:
+            st.caption("Os tempos aparecem a partir da próxima execução do dashboard.")
+
+    if acompanhar_ao_vivo:
+        acompanhar_novas_partidas()
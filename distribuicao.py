@@ -0,0 +1,105 @@
+import numpy as np
+
+# Resumo da distribuição das pontuações de um agente. Como `score` é um inteiro pequeno e não negativo,
+# a contagem de cada valor (np.bincount) descreve a distribuição inteira: quantis, box plot, histograma
+# e KDE saem dela com custo proporcional ao número de pontuações distintas, não ao número de partidas.
+
+
+class DistribuicaoScores:
+    """Contagem de partidas por pontuação (`contagens[s]` = partidas com score s)."""
+
+    def __init__(self, contagens=None):
+        self.contagens = np.zeros(0, dtype=np.int64) if contagens is None else contagens
+
+    @classmethod
+    def de_scores(cls, scores):
+        return cls().acrescentar(scores)
+
+    def acrescentar(self, scores):
+        """Retorna uma nova distribuição com as partidas de `scores` somadas a esta (pontuações NaN são ignoradas)."""
+        scores = np.asarray(scores)
+        if np.issubdtype(scores.dtype, np.floating):
+            scores = scores[~np.isnan(scores)]
+        scores = scores.astype(np.int64)
+        if len(scores) == 0:
+            return self
+        novas = np.bincount(scores, minlength=len(self.contagens))
+        novas[:len(self.contagens)] += self.contagens
+        return DistribuicaoScores(novas)
+
+    @property
+    def n(self):
+        return int(self.contagens.sum())
+
+    def media(self):
+        return float(np.dot(np.arange(len(self.contagens)), self.contagens) / self.n)
+
+    def desvio(self):
+        """Desvio padrão amostral (ddof=1), como o do pandas."""
+        n = self.n
+        if n < 2:
+            return float("nan")
+        valores = np.arange(len(self.contagens))
+        return float(np.sqrt(np.dot((valores - self.media()) ** 2, self.contagens) / (n - 1)))
+
+    def quantis(self, q):
+        """Quantis com interpolação linear, iguais aos de np.quantile sobre as partidas originais."""
+        q = np.asarray(q, dtype=np.float64)
+        acumulado = np.cumsum(self.contagens)
+        posicao = (self.n - 1) * q
+        baixo = np.floor(posicao).astype(np.int64)
+        # O valor na posição k da lista ordenada é o primeiro score cujo acumulado passa de k.
+        valor_baixo = np.searchsorted(acumulado, baixo, side="right")
+        valor_alto = np.searchsorted(acumulado, np.minimum(baixo + 1, self.n - 1), side="right")
+        return valor_baixo + (posicao - baixo) * (valor_alto - valor_baixo)
+
+    def estatisticas_box(self, rotulo, whis=1.5):
+        """Dicionário aceito por `Axes.bxp`, com as mesmas regras do box plot do matplotlib/seaborn."""
+        q1, mediana, q3 = self.quantis([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        presentes = np.flatnonzero(self.contagens)
+        dentro = presentes[(presentes >= q1 - whis * iqr) & (presentes <= q3 + whis * iqr)]
+        # Cada pontuação fora das antenas vira um único ponto (as repetições se sobrepõem no gráfico).
+        fora = presentes[(presentes < q1 - whis * iqr) | (presentes > q3 + whis * iqr)]
+        return {
+            "label": rotulo, "med": mediana, "q1": q1, "q3": q3, "mean": self.media(),
+            "whislo": dentro.min() if len(dentro) else q1, "whishi": dentro.max() if len(dentro) else q3,
+            "fliers": fora,
+        }
+
+    def kde(self, grade):
+        """
+        KDE gaussiana sobre os valores agrupados, escalada para contagens (bins de largura 1), com a
+        largura de banda de Scott usada pelo seaborn. None se não houver variação nos dados.
+        """
+        n, desvio = self.n, self.desvio()
+        if n < 2 or not desvio > 0:
+            return None
+        banda = desvio * n ** (-1 / 5)
+        presentes = np.flatnonzero(self.contagens)
+        z = (np.asarray(grade, dtype=np.float64)[:, None] - presentes[None, :]) / banda
+        return np.exp(-0.5 * z * z) @ self.contagens[presentes] / (banda * np.sqrt(2 * np.pi))
+
+
+class DistribuicoesCache:
+    """
+    Guarda a distribuição de cada agente e a mantém atualizada entre versões dos dados. Enquanto a
+    `geracao` da fonte não muda, as partidas de um agente só crescem no fim, então apenas as novas
+    são contadas; se ela mudar (arquivo reescrito, partição trocada), a contagem é refeita.
+    """
+
+    def __init__(self):
+        self._itens = {}
+
+    def distribuicao(self, versao, geracao, agente, obter_scores):
+        """`obter_scores()` retorna as pontuações do agente na ordem em que foram gravadas."""
+        item = self._itens.get(agente)
+        if item is not None and item[0] == versao:
+            return item[3]
+        scores = np.asarray(obter_scores())
+        if item is not None and item[1] == geracao and len(scores) >= item[2]:
+            distribuicao = item[3].acrescentar(scores[item[2]:])
+        else:
+            distribuicao = DistribuicaoScores.de_scores(scores)
+        self._itens[agente] = (versao, geracao, len(scores), distribuicao)
+        return distribuicao
@@ -0,0 +1,68 @@
+import numpy as np
+
+# Redução de séries longas para o número de pontos que cabe na largura do gráfico,
+# preservando o formato da curva.
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: mantém o primeiro e o último ponto e, de cada balde intermediário,
+    o ponto que forma o maior triângulo com o ponto escolhido no balde anterior e a média do próximo.
+    Retorna os índices dos pontos escolhidos.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Limites dos n_out - 2 baldes entre o primeiro e o último ponto.
+    limites = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    somas_x = np.add.reduceat(x[1:n - 1], limites[:-1] - 1)
+    somas_y = np.add.reduceat(y[1:n - 1], limites[:-1] - 1)
+    tamanhos = np.diff(limites)
+    medias_x = np.append(somas_x / tamanhos, x[-1])
+    medias_y = np.append(somas_y / tamanhos, y[-1])
+
+    escolhidos = np.empty(n_out, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for b in range(n_out - 2):
+        inicio, fim = limites[b], limites[b + 1]
+        ax, ay = x[anterior], y[anterior]
+        cx, cy = medias_x[b + 1], medias_y[b + 1]
+        areas = np.abs((ax - cx) * (y[inicio:fim] - ay) - (ax - x[inicio:fim]) * (cy - ay))
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[b + 1] = anterior
+    return escolhidos
+
+
+def minmax(y, n_out):
+    """
+    Divide a série em n_out / 2 baldes e mantém o mínimo e o máximo de cada um (em ordem),
+    totalmente vetorizado. Retorna os índices dos pontos escolhidos.
+    """
+    n = len(y)
+    n_baldes = max(1, n_out // 2)
+    if n <= n_out:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    tamanho = -(-n // n_baldes)
+    # Completa o último balde repetindo o último valor para poder usar reshape.
+    completado = np.concatenate([y, np.full(tamanho * n_baldes - n, y[-1])]).reshape(n_baldes, tamanho)
+    base = np.arange(n_baldes) * tamanho
+    i_min = np.minimum(base + completado.argmin(axis=1), n - 1)
+    i_max = np.minimum(base + completado.argmax(axis=1), n - 1)
+    return np.unique(np.concatenate([i_min, i_max, [0, n - 1]]))
+
+
+METODOS = {
+    "LTTB": lambda x, y, n_out: lttb(x, y, n_out),
+    "Mín/Máx por balde": lambda x, y, n_out: minmax(y, n_out),
+}
+
+
+def reduzir(x, y, n_out, metodo="LTTB"):
+    """Aplica o `metodo` e retorna (x, y) reduzidos a no máximo ~n_out pontos."""
+    indices = METODOS[metodo](x, y, n_out)
+    return np.asarray(x)[indices], np.asarray(y)[indices]
@@ -0,0 +1,137 @@
+import argparse
+import glob
+import importlib
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from threadpoolctl import threadpool_limits
+
+from agents import POLITICAS
+from replay import ReplayWriter, juntar as juntar_replays
+from snake_env import SnakeEnv
+from stats_log import append_record, read_records, write_records_json
+
+# Espaço entre as seeds de cada execução, para que episódios de seeds vizinhas nunca se repitam.
+_SEEDS_POR_EXECUCAO = 10 ** 9
+
+
+def carregar_politica(especificacao):
+    """
+    Resolve o nome de uma política: um dos nomes de agents.POLITICAS ou 'modulo:fabrica'
+    para plugar uma política própria. A fábrica recebe uma seed e retorna `politica(env)`.
+    """
+    if especificacao in POLITICAS:
+        return POLITICAS[especificacao]
+    modulo, _, atributo = especificacao.partition(":")
+    if not atributo:
+        raise ValueError(f"Política desconhecida: '{especificacao}'. Use um de {sorted(POLITICAS)} ou 'modulo:fabrica'.")
+    return getattr(importlib.import_module(modulo), atributo)
+
+
+def seed_do_episodio(seed, episodio):
+    """Seed determinística de um episódio: não depende de quantos workers foram usados."""
+    return seed * _SEEDS_POR_EXECUCAO + episodio
+
+
+def seeds_independentes(seed):
+    """Duas seeds derivadas de `seed` (ambiente e política), para que os dois RNGs não sigam a mesma sequência."""
+    return [int(filha.generate_state(1)[0]) for filha in np.random.SeedSequence(seed).spawn(2)]
+
+
+def jogar_episodio(fabrica, seed, max_ticks, gravar=False):
+    """Joga uma partida completa e retorna o SnakeEnv ao final (com a trajetória, se `gravar`)."""
+    seed_env, seed_politica = seeds_independentes(seed)
+    env = SnakeEnv(seed=seed_env, record=gravar)
+    politica = fabrica(seed_politica)
+    done = False
+    while not done and env.ticks < max_ticks:
+        _, done = env.step(politica(env))
+    return env
+
+
+def _caminho_shard(diretorio_shards, agente, worker):
+    return os.path.join(diretorio_shards, f"stats_{agente}.part{worker:03d}.jsonl")
+
+
+def _caminho_replay_shard(diretorio_shards, agente, worker):
+    return os.path.join(diretorio_shards, f"replays_{agente}.part{worker:03d}")
+
+
+def _rodar_worker(especificacao, agente, episodios, seed, max_ticks, diretorio_shards, worker, gravar_replays=False):
+    """Joga os `episodios` deste worker gravando cada partida no seu próprio shard."""
+    fabrica = carregar_politica(especificacao)
+    caminho = _caminho_shard(diretorio_shards, agente, worker)
+    replays = ReplayWriter(_caminho_replay_shard(diretorio_shards, agente, worker)) if gravar_replays else None
+    # Cada processo usa um único thread de BLAS/OpenMP para não disputar núcleos com os outros workers.
+    with threadpool_limits(limits=1):
+        for episodio in episodios:
+            env = jogar_episodio(fabrica, seed_do_episodio(seed, episodio), max_ticks, gravar_replays)
+            registro = {"id": episodio + 1}
+            registro.update(env.episode_stats())
+            append_record(caminho, registro)
+            if replays is not None:
+                replays.gravar(env, episodio + 1)
+    if replays is not None:
+        replays.fechar()
+    return len(episodios)
+
+
+def juntar_shards(diretorio_shards, agente, destino):
+    """Une os shards de um agente, ordenados pelo id do episódio, no arquivo `destino` (array JSON)."""
+    shards = sorted(glob.glob(os.path.join(diretorio_shards, f"stats_{agente}.part*.jsonl")))
+    registros = sorted((r for shard in shards for r in read_records(shard)), key=lambda r: r["id"])
+    write_records_json(destino, registros)
+    return shards, len(registros)
+
+
+def avaliar(especificacao, agente, num_episodios, workers=-1, seed=0, max_ticks=100_000, destino=".", manter_shards=False, gravar_replays=False):
+    """
+    Joga `num_episodios` partidas da política em paralelo e grava `stats_<agente>.json` em `destino`
+    (e, com `gravar_replays`, o replay `replays_<agente>`). Retorna o caminho do arquivo de estatísticas.
+    """
+    diretorio_shards = os.path.join(destino, "shards")
+    os.makedirs(diretorio_shards, exist_ok=True)
+    for shard in glob.glob(os.path.join(diretorio_shards, f"stats_{agente}.part*.jsonl")) + glob.glob(os.path.join(diretorio_shards, f"replays_{agente}.part*")):
+        os.remove(shard)
+
+    n_workers = max(1, min(effective_n_jobs(workers), num_episodios))
+    # Episódios intercalados entre os workers (0, W, 2W, ...) equilibram partidas curtas e longas.
+    Parallel(n_jobs=n_workers)(
+        delayed(_rodar_worker)(especificacao, agente, range(w, num_episodios, n_workers), seed, max_ticks, diretorio_shards, w, gravar_replays)
+        for w in range(n_workers)
+    )
+
+    arquivo_final = os.path.join(destino, f"stats_{agente}.json")
+    shards, _ = juntar_shards(diretorio_shards, agente, arquivo_final)
+    if gravar_replays:
+        bases_replay = [_caminho_replay_shard(diretorio_shards, agente, w) for w in range(n_workers)]
+        juntar_replays(bases_replay, os.path.join(destino, f"replays_{agente}"))
+        shards += [base + extensao for base in bases_replay for extensao in (".bin", ".idx")]
+    if not manter_shards:
+        for shard in shards:
+            os.remove(shard)
+        if not os.listdir(diretorio_shards):
+            os.rmdir(diretorio_shards)
+    return arquivo_final
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Avalia uma política jogando muitas partidas em paralelo, sem interface gráfica.")
+    parser.add_argument("politica", help=f"Uma de {sorted(POLITICAS)} ou 'modulo:fabrica'.")
+    parser.add_argument("--agente", help="Nome do agente no dashboard (padrão: nome da política).")
+    parser.add_argument("--episodios", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=-1, help="Número de processos (-1 usa todos os núcleos).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=100_000, help="Limite de ticks por partida.")
+    parser.add_argument("--destino", default=".", help="Diretório onde stats_<agente>.json é gravado.")
+    parser.add_argument("--manter-shards", action="store_true", help="Não apaga os shards de cada worker depois de juntar.")
+    parser.add_argument("--replays", action="store_true", help="Grava também o replay de cada partida em replays_<agente>.bin/.idx.")
+    args = parser.parse_args()
+
+    agente = args.agente or args.politica.replace(":", "_").replace(".", "_")
+    inicio = time.perf_counter()
+    arquivo = avaliar(args.politica, agente, args.episodios, args.workers, args.seed, args.max_ticks, args.destino, args.manter_shards, args.replays)
+    duracao = time.perf_counter() - inicio
+    print(f"{args.episodios} partidas de '{agente}' em {duracao:.1f}s ({args.episodios / duracao:.0f} partidas/s) -> '{arquivo}'")
@@ -1,51 +1,149 @@
-import json
-import random
+import argparse
+import os
 
-def gerar_dados_falsos(nome_arquivo, num_partidas=1000, perfil="balanceado"):
+import numpy as np
+import pandas as pd
+
+# Partidas geradas por lote: a memória usada não depende do total de partidas pedido.
+TAMANHO_LOTE = 250_000
+
+# --- 1. PERFIS DE AGENTE ---
+# Cada perfil é uma função `perfil(i, rng) -> (score, moves)` que recebe o array com os índices
+# (0, 1, 2, ...) das partidas do lote e um np.random.Generator, e sorteia todas de uma vez.
+PERFIS = {}
+
+
+def registrar_perfil(nome):
+    """Decorador que registra um perfil em PERFIS, para ser usado por nome em gerar_dados_falsos."""
+    def registrar(funcao):
+        PERFIS[nome] = funcao
+        return funcao
+    return registrar
+
+
+@registrar_perfil("cauteloso")
+def cauteloso(i, rng):
+    # Aprende devagar, mas é consistente (pouca variação)
+    pontuacao_maxima_possivel = 3 + i // 100
+    score = rng.integers(0, pontuacao_maxima_possivel + 1)
+    moves = score * rng.integers(15, 26, len(i)) + rng.integers(20, 41, len(i)) # Mais movimentos por ponto
+    return score, moves
+
+
+@registrar_perfil("agressivo")
+def agressivo(i, rng):
+    # Tenta scores altos, mas falha mais (muita variação)
+    pontuacao_maxima_possivel = 8 + i // 30
+    # Chance maior de ter score baixo (morreu arriscando) ou alto
+    score = rng.triangular(0, 2, pontuacao_maxima_possivel).astype(np.int64)
+    moves = score * rng.integers(5, 16, len(i)) + rng.integers(10, 31, len(i)) # Menos movimentos por ponto
+    return score, moves
+
+
+@registrar_perfil("balanceado")
+def balanceado(i, rng):
+    pontuacao_maxima_possivel = 5 + i // 50
+    score = rng.integers(0, pontuacao_maxima_possivel + 1)
+    moves = score * rng.integers(8, 21, len(i)) + rng.integers(10, 51, len(i))
+    return score, moves
+
+
+# --- 2. GERAÇÃO EM LOTES ---
+
+def gerar_lotes(num_partidas, perfil="balanceado", seed=None, tamanho_lote=TAMANHO_LOTE):
+    """Gera as partidas em DataFrames de até `tamanho_lote` linhas (mesma seed e lote, mesmos dados)."""
+    if perfil not in PERFIS:
+        raise ValueError(f"Perfil desconhecido: '{perfil}'. Use um de {sorted(PERFIS)}.")
+    sortear = PERFIS[perfil]
+    rng = np.random.default_rng(seed)
+    for inicio in range(0, num_partidas, tamanho_lote):
+        i = np.arange(inicio, min(inicio + tamanho_lote, num_partidas), dtype=np.int64)
+        score, moves = sortear(i, rng)
+        time_seconds = (moves * rng.uniform(0.3, 0.8, len(i))).astype(np.int64)
+        yield pd.DataFrame({
+            "id": (i + 1).astype(np.int32),
+            "score": np.asarray(score, dtype=np.int32),
+            "moves": np.asarray(moves, dtype=np.int32),
+            "time_seconds": time_seconds.astype(np.int32),
+        })
+
+
+# --- 3. ESCRITA ---
+# Cada lote é serializado e escrito antes do próximo ser sorteado.
+
+def _escrever_jsonl(nome_arquivo, lotes):
+    with open(nome_arquivo, 'w') as f:
+        for lote in lotes:
+            f.write(lote.to_json(orient="records", lines=True))
+
+
+def _escrever_json(nome_arquivo, lotes):
+    # Um array JSON com uma partida por linha, montado lote a lote.
+    with open(nome_arquivo, 'w') as f:
+        f.write("[")
+        separador = "\n"
+        for lote in lotes:
+            f.write(separador + lote.to_json(orient="records", lines=True).rstrip("\n").replace("\n", ",\n"))
+            separador = ",\n"
+        f.write("\n]\n")
+
+
+def _escrever_parquet(nome_arquivo, lotes):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from stats_parquet import SCHEMA
+
+    with pq.ParquetWriter(nome_arquivo, SCHEMA) as escritor:
+        for lote in lotes:
+            escritor.write_table(pa.Table.from_pandas(lote, schema=SCHEMA, preserve_index=False))
+
+
+ESCRITORES = {
+    ".json": _escrever_json,
+    ".jsonl": _escrever_jsonl,
+    ".parquet": _escrever_parquet,
+}
+
+
+def gerar_dados_falsos(nome_arquivo, num_partidas=1000, perfil="balanceado", seed=None, tamanho_lote=TAMANHO_LOTE):
     """
-    Gera um arquivo JSON com dados falsos, simulando diferentes perfis de IA.
-    Perfis: 'cauteloso', 'balanceado', 'agressivo'
+    Gera um arquivo com dados falsos, simulando diferentes perfis de IA (ver PERFIS).
+    O formato vem da extensão: .json (array), .jsonl (JSON Lines) ou .parquet.
     """
     print(f"Gerando {num_partidas} partidas para o agente '{nome_arquivo}' com perfil '{perfil}'...")
-    
-    lista_de_partidas = []
-
-    for i in range(num_partidas):
-        partida_id = i + 1
-        
-        # --- Lógica de perfil ---
-        if perfil == "cauteloso":
-            # Aprende devagar, mas é consistente (pouca variação)
-            pontuacao_maxima_possivel = 3 + (i // 100)
-            score = random.randint(0, pontuacao_maxima_possivel)
-            moves = score * random.randint(15, 25) + random.randint(20, 40) # Mais movimentos por ponto
-        elif perfil == "agressivo":
-            # Tenta scores altos, mas falha mais (muita variação)
-            pontuacao_maxima_possivel = 8 + (i // 30)
-            # Chance maior de ter score baixo (morreu arriscando) ou alto
-            score = int(random.triangular(0, pontuacao_maxima_possivel, 2))
-            moves = score * random.randint(5, 15) + random.randint(10, 30) # Menos movimentos por ponto
-        else: # Balanceado (lógica original)
-            pontuacao_maxima_possivel = 5 + (i // 50) 
-            score = random.randint(0, pontuacao_maxima_possivel)
-            moves = score * random.randint(8, 20) + random.randint(10, 50)
-
-        time_seconds = int(moves * random.uniform(0.3, 0.8))
-                
-        nova_partida = {"id": partida_id, "score": score, "moves": moves, "time_seconds": time_seconds}
-        lista_de_partidas.append(nova_partida)
-
+    escrever = ESCRITORES.get(os.path.splitext(nome_arquivo)[1], _escrever_json)
     try:
-        with open(nome_arquivo, 'w') as f:
-            json.dump(lista_de_partidas, f, indent=4)
+        escrever(nome_arquivo, gerar_lotes(num_partidas, perfil, seed, tamanho_lote))
         print(f"Arquivo '{nome_arquivo}' gerado com sucesso!")
     except Exception as e:
         print(f"Ocorreu um erro ao salvar o arquivo: {e}")
 
+
+def gerar_no_dataset(agente, num_partidas=1000, perfil="balanceado", seed=None, tamanho_lote=TAMANHO_LOTE, diretorio=None):
+    """Gera as partidas direto na partição do agente no dataset Parquet usado pelo dashboard."""
+    import pyarrow as pa
+    from stats_parquet import DIRETORIO_PADRAO, SCHEMA, escrever_particao
+
+    tabelas = (pa.Table.from_pandas(lote, schema=SCHEMA, preserve_index=False) for lote in gerar_lotes(num_partidas, perfil, seed, tamanho_lote))
+    linhas = escrever_particao(agente, tabelas, diretorio or DIRETORIO_PADRAO)
+    print(f"Agente '{agente}': {linhas} partidas gravadas no dataset '{diretorio or DIRETORIO_PADRAO}'.")
+
+
 # --- Bloco Principal de Execução ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera estatísticas falsas para testar o dashboard.")
+    parser.add_argument("--partidas", type=int, default=500, help="Partidas por agente.")
+    parser.add_argument("--formato", choices=["json", "jsonl", "parquet", "dataset"], default="json",
+                        help="'dataset' grava direto nas partições do dataset Parquet (stats_parquet.py).")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Partidas geradas e escritas por vez.")
+    args = parser.parse_args()
+
     # Aqui você pode gerar dados para múltiplos agentes com uma única execução
-    gerar_dados_falsos("stats_agente_cauteloso.json", num_partidas=500, perfil="cauteloso")
-    gerar_dados_falsos("stats_agente_balanceado.json", num_partidas=500, perfil="balanceado")
-    gerar_dados_falsos("stats_agente_agressivo.json", num_partidas=500, perfil="agressivo")
-    print("\nTodos os arquivos de dados foram gerados.")
\ No newline at end of file
+    for numero, perfil in enumerate(["cauteloso", "balanceado", "agressivo"]):
+        seed = None if args.seed is None else args.seed + numero
+        if args.formato == "dataset":
+            gerar_no_dataset(f"agente_{perfil}", args.partidas, perfil, seed, args.lote)
+        else:
+            gerar_dados_falsos(f"stats_agente_{perfil}.{args.formato}", args.partidas, perfil, seed, args.lote)
+    print("\nTodos os arquivos de dados foram gerados.")
@@ -0,0 +1,187 @@
+import glob
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from stats_log import nome_do_agente, read_any, parse_line
+
+# Acima deste número de pedaços, os pedaços de um arquivo são unidos em um só DataFrame.
+_MAX_PEDACOS = 32
+# Colunas inteiras guardadas como int32, como no dataset Parquet.
+_COLUNAS_INT32 = ("id", "score", "moves", "time_seconds")
+
+
+class _EstadoArquivo:
+    """O que já foi lido de um arquivo: identidade (tamanho/mtime), offset consumido e os dados."""
+
+    def __init__(self, agente):
+        self.agente = agente
+        self.tamanho = -1
+        self.mtime_ns = -1
+        self.offset = 0
+        self.pedacos = []
+
+    def adicionar(self, df):
+        self.pedacos.append(df)
+        if len(self.pedacos) > _MAX_PEDACOS:
+            self.pedacos = [pd.concat(self.pedacos, ignore_index=True)]
+
+
+def _normalizar(df):
+    """
+    Tipos enxutos: colunas inteiras em int32 e 'date' como datetime. Se faltar algum valor, a coluna
+    fica em float64 (com NaN), que ainda representa exatamente qualquer int32, ao contrário de float32.
+    """
+    for coluna in _COLUNAS_INT32:
+        if coluna in df.columns and df[coluna].dtype != np.int32:
+            valores = pd.to_numeric(df[coluna], errors="coerce")
+            df[coluna] = valores.astype(np.float64 if valores.isna().any() else np.int32)
+    if "date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    return df
+
+
+def _ler_linhas(dados):
+    """Converte bytes de JSON Lines em DataFrame, pulando linhas corrompidas se houver alguma."""
+    try:
+        return pd.read_json(io.BytesIO(dados), lines=True)
+    except ValueError:
+        registros = [r for r in (parse_line(l) for l in dados.splitlines() if l.strip()) if r is not None]
+        return pd.DataFrame(registros)
+
+
+class IncrementalLoader:
+    """
+    Mantém em memória o DataFrame combinado de todos os arquivos de estatísticas e, a cada
+    `atualizar()`, relê apenas o que mudou:
+    - logs JSON Lines (.jsonl) são lidos a partir do último offset consumido, só com as linhas novas;
+    - arrays JSON legados (.json) são relidos por inteiro apenas quando o tamanho ou mtime mudam.
+    `versao` é incrementada sempre que os dados mudam e serve de chave para caches derivados.
+    No DataFrame combinado as partidas de cada agente ficam contíguas; as `fatias` de `dados` dão o
+    intervalo de linhas de cada agente, para acessá-lo sem filtrar nem copiar.
+    `geracao(agente)` só muda quando partidas já lidas de um agente deixam de valer ou partidas novas
+    não entram no fim das dele; enquanto ela não muda, caches podem processar apenas as linhas novas.
+    Como o carregador pode ser compartilhado entre sessões, quem monta caches deve usar a versão e as
+    gerações de `dados`, publicadas junto com o DataFrame, e não `versao`/`geracao` lidos à parte.
+    """
+
+    def __init__(self, padroes_arquivo=("stats_*.json", "stats_*.jsonl")):
+        self.padroes_arquivo = tuple(padroes_arquivo)
+        self.versao = 0
+        self.erros = []
+        self._arquivos = {}
+        self._geracoes = {}
+        # DataFrame, fatias, versão e gerações são trocados juntos, para um leitor nunca misturar versões.
+        self._dados = (None, {}, 0, {})
+        self._lock = threading.Lock()
+
+    @property
+    def df(self):
+        """
+        DataFrame combinado (None se nenhum arquivo tiver dados), com 'agent' categórico, colunas
+        inteiras em int32 (float64 se faltar algum valor) e 'date' como datetime.
+        """
+        return self._dados[0]
+
+    @property
+    def dados(self):
+        """(df, fatias, versao, geracoes) de uma mesma versão, com `geracoes` = {agente: geração}."""
+        return self._dados
+
+    def geracao(self, agente):
+        return self._geracoes.get(agente, 0)
+
+    def _invalidar_agente(self, agente):
+        self._geracoes[agente] = self._geracoes.get(agente, 0) + 1
+
+    def atualizar(self):
+        """Incorpora as mudanças nos arquivos desde a última chamada. Retorna True se os dados mudaram."""
+        with self._lock:
+            encontrados = sorted({a for padrao in self.padroes_arquivo for a in glob.glob(padrao)})
+            mudou = False
+            for arquivo in list(self._arquivos):
+                if arquivo not in encontrados:
+                    del self._arquivos[arquivo]
+                    self._invalidar_agente(nome_do_agente(arquivo))
+                    mudou = True
+
+            self.erros = []
+            for arquivo in encontrados:
+                estado = self._arquivos.get(arquivo)
+                tinha_dados = estado is not None and bool(estado.pedacos)
+                try:
+                    mudou |= self._atualizar_arquivo(arquivo)
+                except (ValueError, OSError):
+                    self._arquivos.pop(arquivo, None)
+                    if tinha_dados:
+                        # As partidas já lidas do arquivo saem dos dados combinados.
+                        self._invalidar_agente(nome_do_agente(arquivo))
+                        mudou = True
+                    self.erros.append(arquivo)
+
+            if mudou or self.versao == 0:
+                df, fatias = self._combinar()
+                self.versao += 1
+                self._dados = (df, fatias, self.versao, dict(self._geracoes))
+            return mudou
+
+    def _atualizar_arquivo(self, arquivo):
+        info = os.stat(arquivo)
+        estado = self._arquivos.get(arquivo)
+        if estado is not None and info.st_size == estado.tamanho and info.st_mtime_ns == estado.mtime_ns:
+            return False
+
+        nome_agente = nome_do_agente(arquivo)
+        recriado = estado is None or not arquivo.endswith(".jsonl") or info.st_size < estado.offset
+        if recriado:
+            # Arquivo novo, array legado alterado ou log truncado/reescrito: leitura completa.
+            estado = _EstadoArquivo(nome_agente)
+            self._arquivos[arquivo] = estado
+            self._invalidar_agente(nome_agente)
+
+        if arquivo.endswith(".jsonl"):
+            with open(arquivo, "rb") as f:
+                f.seek(estado.offset)
+                dados = f.read(info.st_size - estado.offset)
+            # Só consome até a última linha completa; uma escrita em andamento fica para a próxima vez.
+            fim = dados.rfind(b"\n") + 1
+            if fim > 0:
+                df_novo = _ler_linhas(dados[:fim])
+                if not df_novo.empty:
+                    estado.adicionar(_normalizar(df_novo))
+            estado.offset += fim
+        else:
+            fim = 0
+            df_novo = pd.DataFrame(read_any(arquivo))
+            if not df_novo.empty:
+                estado.pedacos = [_normalizar(df_novo)]
+
+        # Linhas acrescentadas a um arquivo que não é o último do agente entram no meio das dele.
+        if not recriado and fim > 0 and any(a > arquivo and nome_do_agente(a) == nome_agente for a in self._arquivos):
+            self._invalidar_agente(nome_agente)
+        estado.tamanho = info.st_size
+        estado.mtime_ns = info.st_mtime_ns
+        return recriado or fim > 0
+
+    def _combinar(self):
+        # Pedaços ordenados por agente (e arquivo), para que as partidas de cada agente fiquem contíguas.
+        estados = sorted(self._arquivos.items(), key=lambda item: (item[1].agente, item[0]))
+        pedacos = [(estado.agente, p) for _, estado in estados for p in estado.pedacos]
+        if not pedacos:
+            return None, {}
+        df = _normalizar(pd.concat([p for _, p in pedacos], ignore_index=True))
+
+        # A coluna 'agent' é montada direto a partir dos códigos, sem comparar nenhum texto linha a linha.
+        agentes = sorted({agente for agente, _ in pedacos})
+        codigo = {agente: i for i, agente in enumerate(agentes)}
+        tamanhos = np.array([len(p) for _, p in pedacos])
+        df['agent'] = pd.Categorical.from_codes(np.repeat([codigo[a] for a, _ in pedacos], tamanhos).astype(np.int16), categories=agentes)
+        fatias, inicio = {}, 0
+        for (agente, _), tamanho in zip(pedacos, tamanhos.tolist()):
+            anterior = fatias.get(agente)
+            fatias[agente] = slice(anterior.start if anterior else inicio, inicio + tamanho)
+            inicio += tamanho
+        return df, fatias
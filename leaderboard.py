@@ -0,0 +1,249 @@
+import warnings
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from bootstrap import N_REAMOSTRAS, intervalo, reamostrar
+from stats_math import grouped_rolling_mean, grouped_slopes, ols_slope
+
+METRICAS_MENOR_MELHOR = ["Consistência (Desvio Padrão)", "Custo por Ponto (Partidas/Score)"]
+# Métricas com reamostras bootstrap, na ordem das colunas de MetricasCache.reamostras. O slope reamostrado
+# é o das pontuações brutas, não o da média móvel exibido no leaderboard, e por isso tem outro nome.
+SLOPE_BRUTO = "Slope (pontuações brutas)"
+METRICAS_BOOTSTRAP = ["Pontuação Média", "Consistência (Desvio Padrão)", SLOPE_BRUTO]
+CUSTO_POR_PONTO = "Custo por Ponto (Partidas/Score)"
+# Métrica do leaderboard (e do peso dos presets) que cada métrica reamostrada representa no ranking.
+METRICA_DO_PESO = {SLOPE_BRUTO: "Taxa de Aprendizado (Slope)"}
+
+
+# Função de normalização segura para evitar divisão por zero.
+def safe_normalize(series):
+    """Normalizes a pandas Series, handling the case where max equals min."""
+    min_val = series.min()
+    max_val = series.max()
+    if max_val == min_val:
+        # Se todos os valores são iguais, retorna 0.5 (neutro) para todos.
+        return pd.Series([0.5] * len(series), index=series.index)
+    return (series - min_val) / (max_val - min_val)
+
+
+def _maximo_acumulado(media_movel):
+    """Máximo acumulado da média móvel; janelas sem nenhuma pontuação válida (NaN) contam como -inf."""
+    return np.maximum.accumulate(np.where(np.isnan(media_movel), -np.inf, media_movel))
+
+
+def calcular_slope(series):
+    """Calcula o coeficiente angular (slope) de uma série de dados por mínimos quadrados em forma fechada."""
+    return ols_slope(series.dropna().to_numpy())
+
+
+class MetricasCache:
+    """
+    Memoiza as métricas do leaderboard da versão atual dos dados, com descarte LRU limitado a
+    `max_itens` entradas. Quando chega uma versão nova, as entradas das anteriores são descartadas
+    de uma vez, para que o modo ao vivo não acumule curvas de versões que nunca mais serão lidas.
+    Os cálculos são separados pelo que cada um realmente depende:
+    - (versão, agente): média e desvio padrão;
+    - (versão, agente, janela): slope da média móvel e o máximo acumulado da curva (a curva em si
+      não é guardada);
+    - (versão, agente, janela, limiar): partidas até o limiar e custo por ponto, obtidos da curva
+      já calculada com uma busca binária.
+    Mudar só o limiar ou o preset não refaz nenhuma média móvel nem regressão.
+    """
+
+    def __init__(self, max_itens=512):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._versao = None
+
+    def _usar_versao(self, versao):
+        """Passa a servir `versao`, descartando as entradas de qualquer outra versão."""
+        if versao != self._versao:
+            self._itens = OrderedDict((chave, valor) for chave, valor in self._itens.items() if chave[1] == versao)
+            self._versao = versao
+
+    def _memo(self, chave, calcular):
+        # Toda chave é (tipo, versão, ...).
+        self._usar_versao(chave[1])
+        if chave in self._itens:
+            self._itens.move_to_end(chave)
+            return self._itens[chave]
+        valor = calcular()
+        self._itens[chave] = valor
+        if len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+        return valor
+
+    def agregados(self, versao, agente, obter_scores):
+        """Retorna (média, desvio padrão) das pontuações do agente."""
+        def calcular():
+            scores = obter_scores()
+            return float(scores.mean()), float(scores.std())
+        return self._memo(("agregados", versao, agente), calcular)
+
+    def curva(self, versao, agente, janela, obter_scores):
+        """Retorna (slope da média móvel, máximo acumulado da média móvel)."""
+        def calcular():
+            scores = obter_scores().to_numpy()
+            media_movel = grouped_rolling_mean(scores, [0, len(scores)], janela)
+            return ols_slope(media_movel), _maximo_acumulado(media_movel)
+        return self._memo(("curva", versao, agente, janela), calcular)
+
+    def preparar_curvas(self, versao, agentes, janela, obter_scores):
+        """
+        Calcula de uma só vez, em uma passada vetorizada agrupada, as curvas dos `agentes` que ainda
+        não estão no cache. `obter_scores(agente)` retorna as pontuações de um agente.
+        """
+        self._usar_versao(versao)
+        faltando = [a for a in agentes if ("curva", versao, a, janela) not in self._itens]
+        if not faltando:
+            return
+        blocos = [obter_scores(a).to_numpy() for a in faltando]
+        offsets = np.concatenate(([0], np.cumsum([len(b) for b in blocos])))
+        medias_moveis = grouped_rolling_mean(np.concatenate(blocos), offsets, janela)
+        slopes = grouped_slopes(medias_moveis, offsets)
+        for i, agente in enumerate(faltando):
+            media_movel = medias_moveis[offsets[i]:offsets[i + 1]]
+            curva = (float(slopes[i]), _maximo_acumulado(media_movel))
+            self._memo(("curva", versao, agente, janela), lambda curva=curva: curva)
+
+    def metricas(self, versao, agente, janela, score_threshold, obter_scores):
+        """Linha do leaderboard de um agente, no mesmo formato da tabela exibida no dashboard."""
+        def calcular():
+            pontuacao_media, desvio = self.agregados(versao, agente, obter_scores)
+            slope, maximo_acumulado = self.curva(versao, agente, janela, obter_scores)
+            # Primeira partida em que a média móvel atinge o limiar (o máximo acumulado é não decrescente).
+            partidas_para_atingir = int(np.searchsorted(maximo_acumulado, score_threshold, side="left"))
+            atingiu_limiar = partidas_para_atingir < len(maximo_acumulado)
+
+            metricas_agente = {"Agente": agente}
+            metricas_agente["Pontuação Média"] = pontuacao_media
+            metricas_agente["Consistência (Desvio Padrão)"] = desvio
+            metricas_agente["Taxa de Aprendizado (Slope)"] = slope
+            metricas_agente[f"Atingiu Limiar de {score_threshold} Pontos?"] = "✅ Sim" if atingiu_limiar else "❌ Não"
+            if atingiu_limiar:
+                metricas_agente["Custo por Ponto (Partidas/Score)"] = partidas_para_atingir / pontuacao_media if pontuacao_media > 0 else float('inf')
+            else:
+                metricas_agente["Custo por Ponto (Partidas/Score)"] = float('inf')
+            return metricas_agente
+        return self._memo(("metricas", versao, agente, janela, score_threshold), calcular)
+
+    def reamostras(self, versao, agente, obter_scores, n_reamostras=N_REAMOSTRAS):
+        """
+        Matriz (n_reamostras, 3) com as METRICAS_BOOTSTRAP de cada reamostra bootstrap do agente (ver
+        bootstrap.py). A reamostragem só depende da versão dos dados, não da janela da média móvel.
+        """
+        def calcular():
+            # Seed fixa por agente: a mesma versão dos dados sempre produz os mesmos intervalos.
+            return reamostrar(obter_scores().to_numpy(), n_reamostras, seed=zlib.crc32(str(agente).encode()))
+        return self._memo(("reamostras", versao, agente, n_reamostras), calcular)
+
+
+def montar_leaderboard(cache, versao, df, agentes, janela, score_threshold, fatias=None):
+    """
+    Monta a tabela de métricas (indexada por agente) usando o cache; agentes sem partidas são omitidos.
+    Com `fatias` (agente -> slice das suas linhas em `df`), as partidas são lidas sem filtrar a coluna 'agent'.
+    """
+    if fatias is None:
+        scores_do_agente = lambda agente: df.loc[df['agent'] == agente, 'score']
+    else:
+        scores_do_agente = lambda agente: df['score'].iloc[fatias.get(agente, slice(0, 0))]
+    cache.preparar_curvas(versao, agentes, janela, scores_do_agente)
+    leaderboard_data = []
+    for agente in agentes:
+        obter_scores = lambda agente=agente: scores_do_agente(agente)
+        pontuacao_media, _ = cache.agregados(versao, agente, obter_scores)
+        if not np.isnan(pontuacao_media):
+            leaderboard_data.append(cache.metricas(versao, agente, janela, score_threshold, obter_scores))
+    if not leaderboard_data:
+        return None
+    return pd.DataFrame(leaderboard_data).set_index("Agente")
+
+
+def _metricas_reamostradas(df_leaderboard, reamostras):
+    """
+    {métrica: matriz (reamostras, agentes)} na ordem de `df_leaderboard`, com as METRICAS_BOOTSTRAP e o
+    custo por ponto. O custo por ponto de cada reamostra divide as partidas até o limiar (fixas, da
+    amostra original) pela média reamostrada.
+    """
+    agentes = list(df_leaderboard.index)
+    matrizes = {m: np.column_stack([reamostras[a][:, i] for a in agentes]) for i, m in enumerate(METRICAS_BOOTSTRAP)}
+    if CUSTO_POR_PONTO in df_leaderboard.columns:
+        medias = df_leaderboard["Pontuação Média"].to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            partidas = np.where(medias > 0, df_leaderboard[CUSTO_POR_PONTO].to_numpy(dtype=np.float64) * medias, np.inf)
+            medias_reamostradas = matrizes["Pontuação Média"]
+            matrizes[CUSTO_POR_PONTO] = np.where(medias_reamostradas > 0, partidas / medias_reamostradas, np.inf)
+    return matrizes
+
+
+def intervalos_confianca(df_leaderboard, reamostras, nivel=0.95):
+    """
+    Intervalo de confiança bootstrap (percentil) de cada métrica reamostrada (ver _metricas_reamostradas);
+    o slope tem o intervalo do slope das pontuações brutas (SLOPE_BRUTO).
+    Retorna um DataFrame indexado por agente com colunas (métrica, "inferior"/"superior").
+    """
+    colunas = {}
+    for metrica, matriz in _metricas_reamostradas(df_leaderboard, reamostras).items():
+        inferior, superior = intervalo(matriz, nivel)
+        colunas[(metrica, "inferior")] = inferior
+        colunas[(metrica, "superior")] = superior
+    return pd.DataFrame(colunas, index=df_leaderboard.index)
+
+
+def probabilidades_ranking(df_leaderboard, reamostras, pesos):
+    """
+    P(agente da linha fica à frente do agente da coluna) no ranking dos `pesos`, estimada aplicando
+    a mesma normalização e ponderação de `ranquear` a cada reamostra bootstrap, de forma vetorizada.
+    O peso da taxa de aprendizado é aplicado ao slope das pontuações brutas de cada reamostra (SLOPE_BRUTO).
+    """
+    matrizes = _metricas_reamostradas(df_leaderboard, reamostras)
+    n_reamostras, n_agentes = matrizes["Pontuação Média"].shape
+    pontuacao = np.zeros((n_reamostras, n_agentes))
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        # Reamostras sem nenhum valor válido (ex.: desvio de agentes com uma só partida) geram avisos de fatia vazia.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for metrica, matriz in matrizes.items():
+            peso = pesos.get(METRICA_DO_PESO.get(metrica, metrica), 0)
+            if not peso:
+                continue
+            # Mesma regra de safe_normalize, por reamostra (linha): 0.5 para todos se não houver variação.
+            minimo = np.nanmin(matriz, axis=1, keepdims=True)
+            maximo = np.nanmax(matriz, axis=1, keepdims=True)
+            normalizada = np.where(maximo == minimo, 0.5, (matriz - minimo) / (maximo - minimo))
+            if metrica in METRICAS_MENOR_MELHOR:
+                normalizada = 1.0 - normalizada
+            pontuacao += peso * np.nan_to_num(normalizada, nan=0.0)
+    a_frente = (pontuacao[:, :, None] > pontuacao[:, None, :]).mean(axis=0)
+    empates = (pontuacao[:, :, None] == pontuacao[:, None, :]).mean(axis=0)
+    probabilidades = a_frente + 0.5 * empates
+    np.fill_diagonal(probabilidades, np.nan)
+    return pd.DataFrame(probabilidades, index=df_leaderboard.index, columns=df_leaderboard.index)
+
+
+def ranquear(df_leaderboard, pesos):
+    """Normaliza as métricas, aplica os `pesos` do preset e retorna o ranking com 'SCORE_FINAL' de 0 a 100."""
+    df_rank = df_leaderboard.copy()
+    for col in df_rank.columns:
+        # Colunas de texto (como "Atingiu Limiar") viram NaN e depois 0; no pandas 3 o dtype delas é 'str', não 'object'.
+        if not pd.api.types.is_numeric_dtype(df_rank[col]):
+            df_rank[col] = pd.to_numeric(df_rank[col], errors='coerce')
+
+    df_normalized = df_rank.apply(safe_normalize, axis=0)
+
+    for col in METRICAS_MENOR_MELHOR:
+        if col in df_normalized.columns:
+            df_normalized[col] = 1.0 - df_normalized[col]
+
+    df_normalized = df_normalized.fillna(0)
+
+    df_normalized['SCORE_FINAL'] = sum(df_normalized[metrica] * pesos.get(metrica, 0) for metrica in df_normalized.columns if metrica != 'SCORE_FINAL')
+
+    score_min, score_max = df_normalized['SCORE_FINAL'].min(), df_normalized['SCORE_FINAL'].max()
+    if score_max - score_min > 0:
+        df_normalized['SCORE_FINAL'] = 100 * (df_normalized['SCORE_FINAL'] - score_min) / (score_max - score_min)
+    else:
+        df_normalized['SCORE_FINAL'] = 100.0
+    return df_normalized.sort_values(by="SCORE_FINAL", ascending=False)
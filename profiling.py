@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+import math
+import os
+import time
+
+# Instrumentação opcional por seções nomeadas. Cada seção acumula um histograma de latências em baldes
+# logarítmicos (4 por potência de 2, de 1 µs a ~2 min), então a memória é fixa e registrar é O(1).
+# Desligado, `secao()` devolve sempre o mesmo objeto vazio: o custo é uma chamada de método.
+
+_BALDES_POR_OITAVA = 4
+_NUM_BALDES = 27 * _BALDES_POR_OITAVA + 1
+
+
+def _limite_superior(balde):
+    """Maior latência (s) que cai no `balde`."""
+    return 2 ** ((balde + 1) / _BALDES_POR_OITAVA) * 1e-6
+
+
+class Histograma:
+    """Contagem de latências por balde, com total, mínimo e máximo exatos."""
+
+    def __init__(self):
+        self.contagens = [0] * _NUM_BALDES
+        self.n = 0
+        self.total = 0.0
+        self.minimo = math.inf
+        self.maximo = 0.0
+
+    def registrar(self, segundos):
+        microssegundos = segundos * 1e6
+        balde = int(math.log2(microssegundos) * _BALDES_POR_OITAVA) if microssegundos > 1 else 0
+        self.contagens[min(balde, _NUM_BALDES - 1)] += 1
+        self.n += 1
+        self.total += segundos
+        if segundos < self.minimo:
+            self.minimo = segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def quantil(self, q):
+        """Quantil aproximado (limite superior do balde, erro relativo de até ~19%)."""
+        alvo, acumulado = q * self.n, 0
+        for balde, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if contagem and acumulado >= alvo:
+                return min(max(_limite_superior(balde), self.minimo), self.maximo)
+        return self.maximo
+
+
+class _Secao:
+    __slots__ = ("perfil", "nome", "inicio")
+
+    def __init__(self, perfil, nome):
+        self.perfil = perfil
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.perfil.registrar(self.nome, time.perf_counter() - self.inicio)
+
+
+class _SecaoNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_SECAO_NULA = _SecaoNula()
+
+
+class Perfil:
+    """
+    Coleção de histogramas por seção. Uso:
+
+        with perfil.secao("jogo.render"):
+            ...
+
+    ou, para intervalos que não cabem em um bloco, `inicio = perfil.marcar()` e depois
+    `perfil.registrar_desde("nome", inicio)`.
+    """
+
+    def __init__(self, ativo=False):
+        self.ativo = ativo
+        self.histogramas = {}
+
+    def secao(self, nome):
+        if not self.ativo:
+            return _SECAO_NULA
+        return _Secao(self, nome)
+
+    def marcar(self):
+        return time.perf_counter() if self.ativo else None
+
+    def registrar_desde(self, nome, inicio):
+        if inicio is not None:
+            self.registrar(nome, time.perf_counter() - inicio)
+
+    def registrar(self, nome, segundos):
+        histograma = self.histogramas.get(nome)
+        if histograma is None:
+            histograma = self.histogramas[nome] = Histograma()
+        histograma.registrar(segundos)
+
+    def limpar(self):
+        self.histogramas = {}
+
+    # --- Resumo e exportação ---
+
+    def resumo(self):
+        """Uma linha por seção (em ms), na ordem em que as seções apareceram."""
+        return [
+            {
+                "secao": nome, "n": h.n, "total_ms": h.total * 1000, "media_ms": h.total / h.n * 1000,
+                "p50_ms": h.quantil(0.5) * 1000, "p90_ms": h.quantil(0.9) * 1000, "p99_ms": h.quantil(0.99) * 1000,
+                "min_ms": h.minimo * 1000, "max_ms": h.maximo * 1000,
+            }
+            for nome, h in self.histogramas.items() if h.n
+        ]
+
+    def para_json(self):
+        """Resumo e histogramas completos (limite superior de cada balde em µs -> contagem)."""
+        return json.dumps({
+            "resumo": self.resumo(),
+            "histogramas": {
+                nome: {f"{_limite_superior(b) * 1e6:.1f}": c for b, c in enumerate(h.contagens) if c}
+                for nome, h in self.histogramas.items()
+            },
+        }, indent=2)
+
+    def para_csv(self):
+        saida = io.StringIO()
+        linhas = self.resumo()
+        if linhas:
+            escritor = csv.DictWriter(saida, fieldnames=list(linhas[0]))
+            escritor.writeheader()
+            escritor.writerows(linhas)
+        return saida.getvalue()
+
+    def exportar(self, caminho):
+        """Grava o resumo em CSV ou, para qualquer outra extensão, o JSON completo."""
+        conteudo = self.para_csv() if caminho.endswith(".csv") else self.para_json()
+        with open(caminho, "w", newline="") as f:
+            f.write(conteudo)
+
+
+# Perfil do processo (usado pelo jogo); ligado pela variável de ambiente SNAKALYTICS_PERFIL=1 ou por `PERFIL.ativo = True`.
+PERFIL = Perfil(ativo=os.environ.get("SNAKALYTICS_PERFIL", "") not in ("", "0"))
@@ -0,0 +1,159 @@
+import argparse
+import os
+import random
+
+import numpy as np
+
+from snake_env import SnakeEnv
+
+# Um replay é guardado em dois arquivos:
+# - <base>.bin: as direções de cada tick, 4 por byte (2 bits cada), episódio após episódio;
+# - <base>.idx: um registro de tamanho fixo por episódio apontando para os seus bytes em .bin.
+# Como o SnakeEnv é determinístico dada a seed, seed + direções reproduzem a partida inteira.
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("seed", "<i8"),
+    ("steps", "<u4"),
+    ("score", "<u4"),
+    ("id", "<u4"),
+    ("cols", "<u2"),
+    ("rows", "<u2"),
+])
+
+
+def nova_seed():
+    """Seed inteira para uma partida gravada (o replay não funciona com seed=None)."""
+    return random.getrandbits(63)
+
+
+def empacotar(trajetoria):
+    """Empacota uma sequência de direções (0-3) em 2 bits por tick."""
+    direcoes = np.frombuffer(bytes(trajetoria), dtype=np.uint8)
+    completo = np.zeros(-(-len(direcoes) // 4) * 4, dtype=np.uint8)
+    completo[:len(direcoes)] = direcoes
+    grupos = completo.reshape(-1, 4)
+    return (grupos[:, 0] | (grupos[:, 1] << 2) | (grupos[:, 2] << 4) | (grupos[:, 3] << 6)).tobytes()
+
+
+def desempacotar(dados, steps):
+    """Operação inversa de `empacotar`: retorna um array uint8 com as `steps` direções."""
+    dados = np.asarray(dados, dtype=np.uint8)
+    return np.stack([(dados >> deslocamento) & 3 for deslocamento in (0, 2, 4, 6)], axis=1).ravel()[:steps]
+
+
+class ReplayWriter:
+    """Acrescenta episódios a um par de arquivos de replay (dados primeiro, índice por último)."""
+
+    def __init__(self, base):
+        self.base = base
+        self._dados = open(base + ".bin", "ab")
+        self._indice = open(base + ".idx", "ab")
+        # Descarta um registro de índice incompleto deixado por uma queda no meio de uma escrita.
+        tamanho_indice = os.path.getsize(base + ".idx")
+        if tamanho_indice % INDEX_DTYPE.itemsize:
+            self._indice.truncate(tamanho_indice - tamanho_indice % INDEX_DTYPE.itemsize)
+
+    def gravar(self, env, episode_id=0):
+        """Grava o episódio de um SnakeEnv criado com `record=True` e uma seed inteira."""
+        self.gravar_trajetoria(env.seed, env.trajectory, env.score, env.cols, env.rows, episode_id)
+
+    def gravar_trajetoria(self, seed, trajetoria, score, cols, rows, episode_id=0):
+        offset = self._dados.seek(0, os.SEEK_END)
+        self._dados.write(empacotar(trajetoria))
+        self._dados.flush()
+        registro = np.array([(offset, seed, len(trajetoria), score, episode_id, cols, rows)], dtype=INDEX_DTYPE)
+        self._indice.write(registro.tobytes())
+        self._indice.flush()
+
+    def fechar(self):
+        self._dados.close()
+        self._indice.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class ReplayReader:
+    """
+    Acesso aleatório aos episódios gravados. Os dois arquivos são mapeados em memória, então abrir
+    um replay com milhões de episódios não lê nada além das páginas efetivamente consultadas.
+    """
+
+    def __init__(self, base):
+        tamanho_indice = os.path.getsize(base + ".idx") // INDEX_DTYPE.itemsize
+        tamanho_dados = os.path.getsize(base + ".bin")
+        self.indice = np.memmap(base + ".idx", dtype=INDEX_DTYPE, mode="r", shape=(tamanho_indice,)) if tamanho_indice else np.zeros(0, INDEX_DTYPE)
+        self.dados = np.memmap(base + ".bin", dtype=np.uint8, mode="r") if tamanho_dados else np.zeros(0, np.uint8)
+
+    def __len__(self):
+        return len(self.indice)
+
+    def acoes(self, k):
+        """Direções de cada tick do episódio `k`."""
+        registro = self.indice[k]
+        inicio = int(registro["offset"])
+        return desempacotar(self.dados[inicio:inicio + -(-int(registro["steps"]) // 4)], int(registro["steps"]))
+
+    def estado(self, k, t=None):
+        """Re-simula o episódio `k` até o tick `t` (o final, se None) e retorna o SnakeEnv nesse ponto."""
+        registro = self.indice[k]
+        env = SnakeEnv(int(registro["cols"]), int(registro["rows"]), seed=int(registro["seed"]))
+        acoes = self.acoes(k)
+        for acao in acoes[:t].tolist():
+            env.step(acao)
+        return env
+
+
+def juntar(bases, destino):
+    """Une vários replays (ex.: um por worker) em `destino`, com o índice ordenado pelo id do episódio."""
+    indices, deslocamento = [], 0
+    with open(destino + ".bin", "wb") as saida:
+        for base in bases:
+            leitor = ReplayReader(base)
+            indice = np.array(leitor.indice)
+            indice["offset"] += deslocamento
+            indices.append(indice)
+            with open(base + ".bin", "rb") as entrada:
+                deslocamento += saida.write(entrada.read())
+    indice = np.concatenate(indices) if indices else np.zeros(0, INDEX_DTYPE)
+    indice[np.argsort(indice["id"], kind="stable")].tofile(destino + ".idx")
+    return len(indice)
+
+
+def desenhar(env):
+    """Representação em texto do tabuleiro: '@' cabeça, 'o' corpo, '*' comida."""
+    linhas = [["." for _ in range(env.cols)] for _ in range(env.rows)]
+    for x, y in env.snake_body:
+        if 0 <= x < env.cols and 0 <= y < env.rows:
+            linhas[y][x] = "o"
+    head_x, head_y = env.head
+    if 0 <= head_x < env.cols and 0 <= head_y < env.rows:
+        linhas[head_y][head_x] = "@"
+    if env.food_pos is not None:
+        linhas[env.food_pos[1]][env.food_pos[0]] = "*"
+    return "\n".join("".join(linha) for linha in linhas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspeciona partidas gravadas em replay.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_info = sub.add_parser("info", help="Resumo do arquivo de replay.")
+    p_info.add_argument("base", help="Caminho sem extensão (ex.: game_replays).")
+    p_show = sub.add_parser("show", help="Mostra o tabuleiro do episódio K no tick T.")
+    p_show.add_argument("base")
+    p_show.add_argument("episodio", type=int)
+    p_show.add_argument("tick", type=int, nargs="?", help="Tick desejado (padrão: o último).")
+    args = parser.parse_args()
+
+    leitor = ReplayReader(args.base)
+    if args.comando == "info":
+        passos = int(leitor.indice["steps"].sum()) if len(leitor) else 0
+        print(f"{len(leitor)} episódios, {passos} ticks, {leitor.dados.nbytes} bytes de ações.")
+    else:
+        env = leitor.estado(args.episodio, args.tick)
+        registro = leitor.indice[args.episodio]
+        print(f"Episódio {args.episodio} (id {int(registro['id'])}, seed {int(registro['seed'])}) - tick {env.ticks}/{int(registro['steps'])}, pontos {env.score}{' - FIM' if env.game_over else ''}")
+        print(desenhar(env))
@@ -0,0 +1,145 @@
+import random
+from collections import deque
+
+# --- 1. CONSTANTES DO AMBIENTE ---
+
+# Direções em sentido horário: a direção oposta de `d` é sempre (d + 2) % 4.
+UP, RIGHT, DOWN, LEFT = 0, 1, 2, 3
+DIRECTIONS = ('UP', 'RIGHT', 'DOWN', 'LEFT')
+DELTAS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+# Dimensões padrão do tabuleiro (800x600 pixels com blocos de 20 no jogo em pygame).
+GRID_COLS, GRID_ROWS = 40, 30
+# Velocidade de referência da simulação, usada para converter ticks em segundos.
+TICKS_PER_SECOND = 15
+
+
+# --- 2. MOTOR DO JOGO SEM RENDERIZAÇÃO ---
+
+class SnakeEnv:
+    """
+    Motor do Jogo da Cobrinha sem nenhuma dependência de pygame.
+    Trabalha em coordenadas de grade (coluna, linha) e avança um tick por chamada de `step`.
+    """
+
+    def __init__(self, cols=GRID_COLS, rows=GRID_ROWS, seed=None, record=False):
+        self.cols = cols
+        self.rows = rows
+        # Com `record`, a direção efetiva de cada tick é guardada em `trajectory` (ver replay.py).
+        self.record = record
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Reinicia a partida. Um `seed` torna a posição da comida reprodutível."""
+        self.seed = seed
+        self.rng = random.Random(seed)
+        head_x, head_y = self.cols // 2, self.rows // 2
+        self._load_body([(head_x, head_y), (head_x - 1, head_y), (head_x - 2, head_y)], RIGHT)
+        self.score = 0
+        self.moves = 0
+        self.ticks = 0
+        self.game_over = False
+        self.trajectory = bytearray() if self.record else None
+        self.food_pos = self._spawn_food()
+        return self
+
+    def _load_body(self, cells, direction):
+        """
+        Posiciona a cobra (cabeça primeiro) e reconstrói as estruturas auxiliares:
+        - `occupancy`: uma posição por célula, 1 se a célula pertence ao corpo;
+        - `_free` / `_free_index`: lista das células livres e a posição de cada célula nela,
+          o que permite retirar, devolver e sortear células livres em tempo constante.
+        """
+        num_cells = self.cols * self.rows
+        self.snake_body = deque(cells)
+        self.direction = direction
+        self.occupancy = bytearray(num_cells)
+        self._free = list(range(num_cells))
+        self._free_index = list(range(num_cells))
+        for x, y in cells:
+            cell = y * self.cols + x
+            self.occupancy[cell] = 1
+            self._take_cell(cell)
+
+    def _take_cell(self, cell):
+        # Troca a célula com a última da lista de livres e a remove do final.
+        pos = self._free_index[cell]
+        last = self._free[-1]
+        self._free[pos] = last
+        self._free_index[last] = pos
+        self._free.pop()
+
+    def _release_cell(self, cell):
+        self._free_index[cell] = len(self._free)
+        self._free.append(cell)
+
+    @property
+    def head(self):
+        return self.snake_body[0]
+
+    def _spawn_food(self):
+        """Sorteia a comida entre as células livres; retorna None se o tabuleiro estiver cheio."""
+        if not self._free:
+            return None
+        cell = self._free[self.rng.randrange(len(self._free))]
+        return (cell % self.cols, cell // self.cols)
+
+    def step(self, action=None):
+        """
+        Avança a simulação em um tick.
+        `action` é uma das direções (UP, RIGHT, DOWN, LEFT) ou None para manter a atual;
+        inverter a direção é ignorado. Retorna (recompensa, fim_de_jogo).
+        """
+        if self.game_over:
+            return 0, True
+
+        if action is not None and action != self.direction and action != (self.direction + 2) % 4:
+            self.direction = action
+            self.moves += 1
+
+        dx, dy = DELTAS[self.direction]
+        head_x, head_y = self.snake_body[0]
+        new_head = (head_x + dx, head_y + dy)
+        self.ticks += 1
+        if self.trajectory is not None:
+            self.trajectory.append(self.direction)
+
+        if not 0 <= new_head[0] < self.cols or not 0 <= new_head[1] < self.rows:
+            self.game_over = True
+            return -1, True
+
+        # A cauda anda antes do teste de colisão, então a cabeça pode ocupar a célula que ela deixou.
+        ate = new_head == self.food_pos
+        if not ate:
+            tail_x, tail_y = self.snake_body.pop()
+            tail_cell = tail_y * self.cols + tail_x
+            self.occupancy[tail_cell] = 0
+            self._release_cell(tail_cell)
+
+        head_cell = new_head[1] * self.cols + new_head[0]
+        if self.occupancy[head_cell]:
+            self.game_over = True
+            return -1, True
+
+        self.snake_body.appendleft(new_head)
+        self.occupancy[head_cell] = 1
+        self._take_cell(head_cell)
+
+        if ate:
+            self.score += 1
+            self.food_pos = self._spawn_food()
+            if self.food_pos is None:
+                # A cobra ocupa o tabuleiro inteiro: não há mais onde crescer.
+                self.game_over = True
+                return 1, True
+            return 1, False
+        return 0, False
+
+    @property
+    def time_seconds(self):
+        """Duração da partida em segundos de jogo, derivada dos ticks simulados."""
+        return self.ticks // TICKS_PER_SECOND
+
+    def episode_stats(self):
+        """Retorna as estatísticas da partida no mesmo formato de `save_stats_to_json` (sem o id)."""
+        return {"score": self.score, "moves": self.moves, "time_seconds": self.time_seconds}
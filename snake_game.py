@@ -1,48 +1,51 @@
 import pygame
 import sys
-import random
-import json
+import argparse
+import atexit
+import time
+from collections import deque
 from datetime import datetime
 
+from profiling import PERFIL
+from snake_env import SnakeEnv, UP, DOWN, LEFT, RIGHT, TICKS_PER_SECOND
+from replay import ReplayWriter, nova_seed
+from snake_renderer import SnakeRenderer
+from stats_log import save_game_record
+
 # --- 1. FUNÇÕES AUXILIARES ---
 
 def save_stats_to_json(score, moves, time_seconds):
     """
-    Lê um arquivo JSON de estatísticas, adiciona os novos dados da partida com um ID sequencial
-    e salva o arquivo novamente.
+    Acrescenta os dados da partida, com um ID sequencial, ao log de estatísticas em JSON Lines.
+    Cada partida é uma linha nova: o histórico já salvo nunca é relido nem reescrito.
     """
-    filename = "game_stats.json"
-    
-    try:
-        with open(filename, 'r') as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        data = []
-        
-    # Get the ID of the last entry, or 0 if the list is empty.
-    last_id = data[-1]['id'] if data else 0
-    
-    # The new ID is the last ID plus one.
-    new_id = last_id + 1
-
-    # Cria o dicionário com os dados da partida atual, incluindo o novo ID
-    new_entry = {
-        "id": new_id, 
-        "score": score,
-        "moves": moves,
-        "time_seconds": time_seconds
-    }
-    
-    data.append(new_entry)
-    
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=4)
-    
+    filename = "game_stats.jsonl"
+    new_id = save_game_record(filename, score, moves, time_seconds)
     print(f"Estatísticas da Partida #{new_id} salvas em '{filename}'")
+    return new_id
 
 
 # --- 2. FUNÇÃO PRINCIPAL QUE CONTROLA O JOGO ---
-def run_game():
+
+# Quadros desenhados por segundo, independente da velocidade da simulação.
+FPS_PADRAO = 15
+# Teclas guardadas para os próximos ticks (uma direção por tick); além disso, as novas são descartadas.
+TAMANHO_FILA_ENTRADA = 3
+# Atraso máximo (s) que o acumulador recupera de uma vez, para uma travada não virar uma rajada de ticks.
+MAX_ATRASO = 0.25
+
+def run_game(politica=None, ticks_por_segundo=TICKS_PER_SECOND, fps=FPS_PADRAO, render_every=1):
+    """
+    Roda o jogo. Sem `politica`, a cobra é controlada pelo teclado; com uma `politica(env)` (ver
+    agents.py) o jogo vira modo espectador e a tela só é redesenhada a cada `render_every` ticks,
+    o que permite assistir partidas longas rapidamente.
+
+    A simulação avança em passo fixo de `ticks_por_segundo` (0 = o mais rápido possível), separada da
+    taxa de desenho `fps`: a cada quadro, o tempo real decorrido é acumulado e convertido em ticks.
+    As teclas entram em uma fila e cada tick consome no máximo uma, então nenhuma é perdida entre
+    dois ticks. O tempo da partida vem dos ticks simulados (`env.time_seconds`), o que mantém as
+    estatísticas comparáveis em qualquer velocidade.
+    """
     # --- Inicialização e Configurações ---
     pygame.init()
     
@@ -50,37 +53,32 @@ def run_game():
     WIDTH, HEIGHT = 800, 600
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Jogo da Cobrinha")
-    
-    # Cores
-    BLACK = (0, 0, 0)
-    WHITE = (255, 255, 255)
-    RED = (255, 0, 0)
-    GREEN = (0, 255, 0)
-    DARK_GREEN = (0, 155, 0)
-    GRAY = (40, 40, 40)
-    BUTTON_COLOR = (0, 100, 200)
+    # A grade, as fontes e os textos ficam em cache no renderizador; cada quadro só atualiza o que mudou.
+    renderer = SnakeRenderer(screen, BLOCK_SIZE)
 
     fps_controller = pygame.time.Clock()
+    replay_writer = ReplayWriter("game_replays")
+    passo = 1 / ticks_por_segundo if ticks_por_segundo else 0.0
+    # Em velocidades baixas um tick dura mais que MAX_ATRASO; o limite nunca pode ser menor que um tick.
+    atraso_maximo = max(MAX_ATRASO, passo)
 
     # --- Função para resetar o estado do jogo ---
+    # A lógica fica toda no SnakeEnv; aqui guardamos apenas o que é da interface (pausa e entrada).
     def reset_game_state():
         return {
-            "snake_pos": [WIDTH / 2, HEIGHT / 2],
-            "snake_body": [[WIDTH / 2, HEIGHT / 2], [WIDTH / 2 - BLOCK_SIZE, HEIGHT / 2], [WIDTH / 2 - (2 * BLOCK_SIZE), HEIGHT / 2]],
-            "direction": 'RIGHT',
-            "food_pos": [random.randrange(1, (WIDTH // BLOCK_SIZE)) * BLOCK_SIZE, random.randrange(1, (HEIGHT // BLOCK_SIZE)) * BLOCK_SIZE],
-            "score": 0,
-            "moves": 0,
-            "start_time": pygame.time.get_ticks(),
-            "total_paused_time": 0,
-            "time_at_pause": 0,
-            "game_over": False,
+            # Cada partida é gravada (seed + direções) para poder ser revista depois com replay.py.
+            "env": SnakeEnv(WIDTH // BLOCK_SIZE, HEIGHT // BLOCK_SIZE, seed=nova_seed(), record=True),
+            "fila_entrada": deque(),
+            "acumulado": 0.0,
+            # Começa em render_every para que o primeiro quadro de cada partida seja desenhado.
+            "ticks_sem_desenho": render_every,
             "paused": False
         }
 
     # --- Tela de Fim de Jogo ---
     def game_over_screen(final_score, final_moves, final_time_seconds):
-        replay_button_rect = pygame.Rect(WIDTH / 2 - 100, HEIGHT / 2 + 50, 200, 50)
+        # A tela é estática: desenha uma vez e depois só espera o clique.
+        replay_button_rect = renderer.tela_fim_de_jogo(final_score, final_moves, final_time_seconds)
         while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -89,115 +87,107 @@ def run_game():
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if replay_button_rect.collidepoint(event.pos):
                         return # Reinicia o jogo
-
-            # Desenho da tela de game over
-            screen.fill(BLACK)
-            font_large = pygame.font.SysFont('arial', 50)
-            font_small = pygame.font.SysFont('arial', 30)
-            title_surface = font_large.render('FIM DE JOGO', True, WHITE)
-            screen.blit(title_surface, title_surface.get_rect(center=(WIDTH / 2, HEIGHT / 4)))
-            minutes, seconds = divmod(final_time_seconds, 60)
-            stats_text = f'Pontos: {final_score} | Movimentos: {final_moves} | Tempo: {minutes:02d}:{seconds:02d}'
-            stats_surface = font_small.render(stats_text, True, WHITE)
-            screen.blit(stats_surface, stats_surface.get_rect(center=(WIDTH / 2, HEIGHT / 2 - 20)))
-            pygame.draw.rect(screen, BUTTON_COLOR, replay_button_rect)
-            replay_text_surface = font_small.render('Jogar Novamente', True, WHITE)
-            screen.blit(replay_text_surface, replay_text_surface.get_rect(center=replay_button_rect.center))
-            pygame.display.update()
             fps_controller.tick(15)
 
+    # --- Um tick da simulação ---
+    def avancar(game_state):
+        env = game_state["env"]
+        if politica is None:
+            fila_entrada = game_state["fila_entrada"]
+            env.step(fila_entrada.popleft() if fila_entrada else None)
+        else:
+            env.step(politica(env))
+        renderer.observar(env)
+        game_state["ticks_sem_desenho"] += 1
+
     # --- Inicialização do Primeiro Jogo ---
     game_state = reset_game_state()
-    change_to = game_state["direction"]
+    key_to_direction = {pygame.K_UP: UP, pygame.K_DOWN: DOWN, pygame.K_LEFT: LEFT, pygame.K_RIGHT: RIGHT}
+    fps_controller.tick()
+    dt = 0.0
     
     # --- Loop Principal (Gerenciador de Estados) ---
     while True:
+        env = game_state["env"]
+        inicio_quadro = PERFIL.marcar()
         # --- Processamento de Eventos ---
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_p or event.key == pygame.K_SPACE:
-                    game_state["paused"] = not game_state["paused"]
-                    if game_state["paused"]:
-                        # Guarda o momento em que o jogo foi pausado
-                        game_state["time_at_pause"] = pygame.time.get_ticks()
-                    else:
-                        # Ao despausar, calcula quanto tempo ficou parado e acumula
-                        game_state["total_paused_time"] += pygame.time.get_ticks() - game_state["time_at_pause"]
+        with PERFIL.secao("jogo.eventos"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_p or event.key == pygame.K_SPACE:
+                        game_state["paused"] = not game_state["paused"]
                 
-                if not game_state["paused"]:
-                    # Lógica de controle de direção
-                    if event.key == pygame.K_UP and game_state["direction"] != 'DOWN': change_to = 'UP'; game_state["moves"] += 1
-                    if event.key == pygame.K_DOWN and game_state["direction"] != 'UP': change_to = 'DOWN'; game_state["moves"] += 1
-                    if event.key == pygame.K_LEFT and game_state["direction"] != 'RIGHT': change_to = 'LEFT'; game_state["moves"] += 1
-                    if event.key == pygame.K_RIGHT and game_state["direction"] != 'LEFT': change_to = 'RIGHT'; game_state["moves"] += 1
+                    if politica is None and not game_state["paused"] and event.key in key_to_direction:
+                        # Enfileira a direção se ela muda algo em relação à última já pedida;
+                        # repetições e inversões seriam ignoradas pelo SnakeEnv e só gastariam um tick.
+                        fila_entrada = game_state["fila_entrada"]
+                        direcao = key_to_direction[event.key]
+                        ultima = fila_entrada[-1] if fila_entrada else env.direction
+                        if direcao != ultima and direcao != (ultima + 2) % 4 and len(fila_entrada) < TAMANHO_FILA_ENTRADA:
+                            fila_entrada.append(direcao)
         
         # --- Lógica do Jogo ---
-        if not game_state["paused"] and not game_state["game_over"]:
-            game_state["direction"] = change_to
-            if game_state["direction"] == 'UP': game_state["snake_pos"][1] -= BLOCK_SIZE
-            if game_state["direction"] == 'DOWN': game_state["snake_pos"][1] += BLOCK_SIZE
-            if game_state["direction"] == 'LEFT': game_state["snake_pos"][0] -= BLOCK_SIZE
-            if game_state["direction"] == 'RIGHT': game_state["snake_pos"][0] += BLOCK_SIZE
-            game_state["snake_body"].insert(0, list(game_state["snake_pos"]))
-            if game_state["snake_body"][0] == game_state["food_pos"]:
-                game_state["score"] += 1
-                game_state["food_pos"] = [random.randrange(1, (WIDTH // BLOCK_SIZE)) * BLOCK_SIZE, random.randrange(1, (HEIGHT // BLOCK_SIZE)) * BLOCK_SIZE]
-            else:
-                game_state["snake_body"].pop()
-            if (game_state["snake_pos"][0] < 0 or game_state["snake_pos"][0] >= WIDTH or game_state["snake_pos"][1] < 0 or game_state["snake_pos"][1] >= HEIGHT or game_state["snake_body"][0] in game_state["snake_body"][1:]):
-                game_state["game_over"] = True
+        with PERFIL.secao("jogo.logica"):
+            if not game_state["paused"] and not env.game_over:
+                if passo:
+                    # Passo fixo: executa os ticks que couberam no tempo real desde o último quadro.
+                    game_state["acumulado"] = min(game_state["acumulado"] + dt, atraso_maximo)
+                    while game_state["acumulado"] >= passo and not env.game_over:
+                        avancar(game_state)
+                        game_state["acumulado"] -= passo
+                else:
+                    # Avanço rápido: simula até esgotar o tempo de um quadro e só então desenha.
+                    limite = time.perf_counter() + 1 / fps
+                    while not env.game_over and time.perf_counter() < limite:
+                        avancar(game_state)
 
         # --- Renderização ---
-        screen.fill(BLACK)
-        
-        if game_state["game_over"]:
-            # Calcula o tempo final ANTES de entrar na tela de game over
-            final_time = (pygame.time.get_ticks() - game_state["start_time"] - game_state["total_paused_time"]) // 1000
-            # Salva as estatísticas no arquivo JSON
-            save_stats_to_json(game_state["score"], game_state["moves"], final_time)
+        if env.game_over:
+            # O quadro termina aqui: a espera na tela de fim de jogo não entra no histograma de quadros.
+            PERFIL.registrar_desde("jogo.quadro", inicio_quadro)
+            inicio_quadro = None
+            # Salva as estatísticas no log JSON Lines e a partida no arquivo de replay
+            game_id = save_stats_to_json(env.score, env.moves, env.time_seconds)
+            replay_writer.gravar(env, game_id)
             # Mostra a tela de fim de jogo
-            game_over_screen(game_state["score"], game_state["moves"], final_time)
-            # Se a função retornar, reinicia o jogo
+            game_over_screen(env.score, env.moves, env.time_seconds)
+            # Se a função retornar, reinicia o jogo (o tempo parado na tela de fim não é acumulado)
             game_state = reset_game_state()
-            change_to = game_state["direction"]
-        else:
-            # Desenha os elementos do jogo
-            for x in range(0, WIDTH, BLOCK_SIZE): pygame.draw.line(screen, GRAY, (x, 0), (x, HEIGHT))
-            for y in range(0, HEIGHT, BLOCK_SIZE): pygame.draw.line(screen, GRAY, (0, y), (WIDTH, y))
-            for pos in game_state["snake_body"]: pygame.draw.rect(screen, GREEN, pygame.Rect(pos[0], pos[1], BLOCK_SIZE, BLOCK_SIZE))
-            pygame.draw.rect(screen, DARK_GREEN, pygame.Rect(game_state["snake_body"][0][0], game_state["snake_body"][0][1], BLOCK_SIZE, BLOCK_SIZE))
-            pygame.draw.rect(screen, RED, pygame.Rect(game_state["food_pos"][0], game_state["food_pos"][1], BLOCK_SIZE, BLOCK_SIZE))
-            
-            # --- LÓGICA DO TIMER ---
-            # O tempo decorrido é calculado aqui para ser exibido no cabeçalho
-            if game_state["paused"]:
-                # Se pausado, o tempo "congela" no momento da pausa
-                current_ticks = game_state["time_at_pause"]
-            else:
-                # Se rodando, o tempo continua a contar
-                current_ticks = pygame.time.get_ticks()
-            
-            elapsed_time = (current_ticks - game_state["start_time"] - game_state["total_paused_time"]) // 1000
-            minutes, seconds = divmod(elapsed_time, 60)
-            
-            # Desenha o cabeçalho
-            font = pygame.font.SysFont('arial', 24)
-            score_surface = font.render(f'Pontos: {game_state["score"]}', True, WHITE)
-            screen.blit(score_surface, score_surface.get_rect(topleft=(10, 10)))
-            moves_surface = font.render(f'Movimentos: {game_state["moves"]}', True, WHITE)
-            screen.blit(moves_surface, moves_surface.get_rect(topright=(WIDTH - 10, 10)))
-            timer_surface = font.render(f'Tempo: {minutes:02d}:{seconds:02d}', True, WHITE)
-            screen.blit(timer_surface, timer_surface.get_rect(midtop=(WIDTH / 2, 10)))
-
-            if game_state["paused"]:
-                pause_surface = pygame.font.SysFont('arial', 50).render('PAUSADO', True, WHITE)
-                screen.blit(pause_surface, pause_surface.get_rect(center=(WIDTH / 2, HEIGHT / 2)))
-
-        pygame.display.update()
-        fps_controller.tick(15)
+            fps_controller.tick()
+        elif politica is None or game_state["paused"] or game_state["ticks_sem_desenho"] >= render_every:
+            # Modo espectador: o renderizador acumula as células alteradas e desenha a cada render_every ticks.
+            with PERFIL.secao("jogo.render"):
+                renderer.desenhar(env, env.time_seconds, game_state["paused"])
+            game_state["ticks_sem_desenho"] = 0
+
+        # Trabalho do quadro (sem a espera do relógio) e o intervalo real entre quadros;
+        # registrar_desde ignora o quadro de fim de jogo, já registrado antes da tela de fim.
+        PERFIL.registrar_desde("jogo.quadro", inicio_quadro)
+        dt = fps_controller.tick(fps) / 1000
+        if PERFIL.ativo:
+            PERFIL.registrar("jogo.intervalo_quadros", dt)
 
 # Executa o jogo
-run_game()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Jogo da Cobrinha. Com --agente, assiste uma política jogando (modo espectador).")
+    parser.add_argument("--agente", help="Política de agents.POLITICAS ou 'modulo:fabrica'. Sem ela, o jogo é pelo teclado.")
+    parser.add_argument("--velocidade", type=int, default=TICKS_PER_SECOND, metavar="TICKS",
+                        help=f"Ticks simulados por segundo (padrão: {TICKS_PER_SECOND}); 0 avança o mais rápido possível.")
+    parser.add_argument("--fps", type=int, default=FPS_PADRAO, help=f"Quadros desenhados por segundo (padrão: {FPS_PADRAO}).")
+    parser.add_argument("--espectador", type=int, default=1, metavar="K", help="No modo espectador, desenha a tela só a cada K ticks (padrão: 1).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed da política.")
+    parser.add_argument("--perfil", metavar="ARQUIVO", help="Mede o tempo de cada fase do loop e grava os histogramas ao sair (.json ou .csv).")
+    args = parser.parse_args()
+
+    if args.perfil:
+        PERFIL.ativo = True
+        atexit.register(PERFIL.exportar, args.perfil)
+
+    politica = None
+    if args.agente:
+        from evaluate_agents import carregar_politica
+        politica = carregar_politica(args.agente)(args.seed)
+    run_game(politica, max(0, args.velocidade), max(1, args.fps), max(1, args.espectador))
@@ -0,0 +1,191 @@
+from collections import deque
+
+import pygame
+
+# Cores
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+DARK_GREEN = (0, 155, 0)
+GRAY = (40, 40, 40)
+BUTTON_COLOR = (0, 100, 200)
+
+# Limite de superfícies de texto guardadas; ao estourar, o cache é esvaziado.
+_MAX_TEXTOS = 256
+
+
+class SnakeRenderer:
+    """
+    Desenha um SnakeEnv na tela redesenhando só o que mudou.
+
+    A grade é desenhada uma única vez em uma superfície de fundo, fontes e textos renderizados ficam em
+    cache e, a cada quadro, apenas as células alteradas (cabeça nova, cauda liberada, comida) e os
+    textos do cabeçalho que mudaram são enviados com `pygame.display.update(rects)`.
+    `observar(env)` deve ser chamado após cada tick simulado, mesmo nos ticks que não são desenhados.
+    """
+
+    def __init__(self, screen, block_size):
+        self.screen = screen
+        self.block_size = block_size
+        self.width, self.height = screen.get_size()
+        self._fontes = {}
+        self._textos = {}
+
+        self.background = pygame.Surface((self.width, self.height))
+        self.background.fill(BLACK)
+        for x in range(0, self.width, block_size): pygame.draw.line(self.background, GRAY, (x, 0), (x, self.height))
+        for y in range(0, self.height, block_size): pygame.draw.line(self.background, GRAY, (0, y), (self.width, y))
+
+        self._env = None
+        self._corpo = deque()
+        self._ticks = -1
+        self._comida = None
+        self._sujas = set()
+        self._hud = {}
+        self._pausado = False
+        self._completo = True
+
+    # --- Cache de fontes e textos ---
+
+    def fonte(self, tamanho):
+        if tamanho not in self._fontes:
+            self._fontes[tamanho] = pygame.font.SysFont('arial', tamanho)
+        return self._fontes[tamanho]
+
+    def texto(self, conteudo, tamanho):
+        chave = (conteudo, tamanho)
+        superficie = self._textos.get(chave)
+        if superficie is None:
+            if len(self._textos) >= _MAX_TEXTOS:
+                self._textos.clear()
+            superficie = self._textos[chave] = self.fonte(tamanho).render(conteudo, True, WHITE)
+        return superficie
+
+    # --- Acompanhamento das mudanças do jogo ---
+
+    def invalidar(self):
+        """Força o redesenho completo no próximo quadro."""
+        self._completo = True
+
+    def observar(self, env):
+        """Registra as células alteradas pelo último tick de `env`."""
+        if env is not self._env or env.ticks != self._ticks + 1 or env.game_over:
+            self._sincronizar(env)
+            return
+        self._ticks = env.ticks
+        cabeca = env.snake_body[0]
+        if cabeca != self._corpo[0]:
+            self._sujas.add(self._corpo[0])
+            self._sujas.add(cabeca)
+            self._corpo.appendleft(cabeca)
+        while len(self._corpo) > len(env.snake_body):
+            self._sujas.add(self._corpo.pop())
+        if env.food_pos != self._comida:
+            self._sujas.add(self._comida)
+            self._sujas.add(env.food_pos)
+            self._comida = env.food_pos
+
+    def _sincronizar(self, env):
+        self._env = env
+        self._corpo = deque(env.snake_body)
+        self._ticks = env.ticks
+        self._comida = env.food_pos
+        self._completo = True
+
+    # --- Desenho ---
+
+    def _rect(self, celula):
+        return pygame.Rect(celula[0] * self.block_size, celula[1] * self.block_size, self.block_size, self.block_size)
+
+    def _desenhar_celula(self, env, celula):
+        """Redesenha uma célula de acordo com o estado atual do jogo e retorna o seu retângulo."""
+        rect = self._rect(celula)
+        x, y = celula
+        if not (0 <= x < env.cols and 0 <= y < env.rows):
+            return rect
+        if celula == env.head:
+            pygame.draw.rect(self.screen, DARK_GREEN, rect)
+        elif env.occupancy[y * env.cols + x]:
+            pygame.draw.rect(self.screen, GREEN, rect)
+        elif celula == env.food_pos:
+            pygame.draw.rect(self.screen, RED, rect)
+        else:
+            self.screen.blit(self.background, rect, rect)
+        return rect
+
+    def _restaurar_area(self, env, area):
+        """Apaga uma área (ex.: um texto antigo) devolvendo o fundo e as células que estão sob ela."""
+        self.screen.blit(self.background, area, area)
+        b = self.block_size
+        for cx in range(area.left // b, (area.right - 1) // b + 1):
+            for cy in range(area.top // b, (area.bottom - 1) // b + 1):
+                if 0 <= cx < env.cols and 0 <= cy < env.rows and (env.occupancy[cy * env.cols + cx] or (cx, cy) == env.food_pos):
+                    self._desenhar_celula(env, (cx, cy))
+
+    def _itens_hud(self, env, tempo_segundos):
+        minutes, seconds = divmod(tempo_segundos, 60)
+        score_surface = self.texto(f'Pontos: {env.score}', 24)
+        moves_surface = self.texto(f'Movimentos: {env.moves}', 24)
+        timer_surface = self.texto(f'Tempo: {minutes:02d}:{seconds:02d}', 24)
+        return {
+            "score": (score_surface, score_surface.get_rect(topleft=(10, 10))),
+            "moves": (moves_surface, moves_surface.get_rect(topright=(self.width - 10, 10))),
+            "timer": (timer_surface, timer_surface.get_rect(midtop=(self.width / 2, 10))),
+        }
+
+    def desenhar(self, env, tempo_segundos, pausado=False):
+        """Desenha o quadro atual, enviando à tela apenas as áreas que mudaram."""
+        if env is not self._env:
+            self._sincronizar(env)
+        if pausado != self._pausado:
+            self._pausado = pausado
+            self._completo = True
+        hud = self._itens_hud(env, tempo_segundos)
+
+        if self._completo:
+            self.screen.blit(self.background, (0, 0))
+            for pos in env.snake_body: pygame.draw.rect(self.screen, GREEN, self._rect(pos))
+            pygame.draw.rect(self.screen, DARK_GREEN, self._rect(env.head))
+            if env.food_pos is not None:
+                pygame.draw.rect(self.screen, RED, self._rect(env.food_pos))
+            for superficie, rect in hud.values():
+                self.screen.blit(superficie, rect)
+            if pausado:
+                pause_surface = self.texto('PAUSADO', 50)
+                self.screen.blit(pause_surface, pause_surface.get_rect(center=(self.width / 2, self.height / 2)))
+            pygame.display.update()
+            self._hud = hud
+            self._sujas.clear()
+            self._completo = False
+            return
+
+        rects = [self._desenhar_celula(env, celula) for celula in self._sujas if celula is not None]
+        self._sujas.clear()
+        for nome, (superficie, rect) in hud.items():
+            superficie_anterior, rect_anterior = self._hud.get(nome, (None, rect))
+            # Redesenha o texto se ele mudou ou se alguma célula redesenhada passou por cima dele.
+            if superficie is not superficie_anterior or rect.collidelist(rects) != -1:
+                area = rect.union(rect_anterior)
+                self._restaurar_area(env, area)
+                self.screen.blit(superficie, rect)
+                rects.append(area)
+        self._hud = hud
+        if rects:
+            pygame.display.update(rects)
+
+    def tela_fim_de_jogo(self, final_score, final_moves, final_time_seconds):
+        """Desenha a tela de fim de jogo (uma única vez) e retorna o retângulo do botão de jogar novamente."""
+        replay_button_rect = pygame.Rect(self.width / 2 - 100, self.height / 2 + 50, 200, 50)
+        self.screen.fill(BLACK)
+        title_surface = self.texto('FIM DE JOGO', 50)
+        self.screen.blit(title_surface, title_surface.get_rect(center=(self.width / 2, self.height / 4)))
+        minutes, seconds = divmod(final_time_seconds, 60)
+        stats_surface = self.texto(f'Pontos: {final_score} | Movimentos: {final_moves} | Tempo: {minutes:02d}:{seconds:02d}', 30)
+        self.screen.blit(stats_surface, stats_surface.get_rect(center=(self.width / 2, self.height / 2 - 20)))
+        pygame.draw.rect(self.screen, BUTTON_COLOR, replay_button_rect)
+        replay_text_surface = self.texto('Jogar Novamente', 30)
+        self.screen.blit(replay_text_surface, replay_text_surface.get_rect(center=replay_button_rect.center))
+        pygame.display.update()
+        self._completo = True
+        return replay_button_rect
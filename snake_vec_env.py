@@ -0,0 +1,340 @@
+import numpy as np
+
+from snake_env import RIGHT, DELTAS, GRID_COLS, GRID_ROWS, TICKS_PER_SECOND
+
+# Deslocamentos (dx, dy) indexados pela direção, na mesma ordem de snake_env.DELTAS.
+DX = np.array([d[0] for d in DELTAS], dtype=np.int32)
+DY = np.array([d[1] for d in DELTAS], dtype=np.int32)
+
+# Número de tentativas de sorteio da comida antes de recorrer à busca pelas células livres.
+_FOOD_RETRIES = 8
+
+# Observação em planos: para cada partida, NUM_PLANES tabuleiros (rows x cols) de 0/1.
+PLANE_BODY, PLANE_HEAD, PLANE_FOOD = 0, 1, 2
+NUM_PLANES = 3
+# Vetor de características: perigo à frente/à direita/à esquerda, direção atual (4, one-hot) e
+# comida à esquerda/à direita/acima/abaixo da cabeça.
+NUM_FEATURES = 11
+
+
+class BatchSnakeEnv:
+    """
+    Executa N partidas do Jogo da Cobrinha em paralelo, com todo o estado em arrays NumPy.
+
+    As células do tabuleiro são indexadas de forma achatada (linha * cols + coluna). O corpo de
+    cada cobra é um buffer circular em `body`, delimitado por `head_ptr` e `tail_ptr`, e `occupancy`
+    marca as células ocupadas de cada tabuleiro. Partidas encerradas são reiniciadas
+    automaticamente dentro do próprio `step`.
+
+    A observação para políticas em lote (`observation`, com os planos corpo/cabeça/comida) é mantida
+    no lugar: `occupancy` é o próprio plano do corpo e, a cada tick, só as células da cabeça, da cauda
+    e da comida que mudaram são escritas, sem reconstruir nada a partir do corpo.
+    """
+
+    def __init__(self, num_envs, cols=GRID_COLS, rows=GRID_ROWS, seed=None, start_id=1):
+        self.num_envs = num_envs
+        self.cols = cols
+        self.rows = rows
+        self.num_cells = cols * rows
+        self.rng = np.random.default_rng(seed)
+        # Próximo id sequencial atribuído a uma partida encerrada, como em save_stats_to_json.
+        self.next_id = start_id
+
+        self._all = np.arange(num_envs)
+        self.planes = np.zeros((num_envs, NUM_PLANES, self.num_cells), dtype=np.uint8)
+        self.occupancy = self.planes[:, PLANE_BODY]
+        self._features = np.zeros((num_envs, NUM_FEATURES), dtype=np.float32)
+        self._buffers_features = _BuffersFeatures(num_envs)
+        self.body = np.zeros((num_envs, self.num_cells), dtype=np.int32)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.tail_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int32)
+        self.direction = np.zeros(num_envs, dtype=np.int8)
+        self.food = np.zeros(num_envs, dtype=np.int32)
+        self.score = np.zeros(num_envs, dtype=np.int32)
+        self.moves = np.zeros(num_envs, dtype=np.int32)
+        self.ticks = np.zeros(num_envs, dtype=np.int32)
+        self._reset_envs(self._all)
+
+    def reset(self):
+        """Reinicia todas as partidas do lote."""
+        self._reset_envs(self._all)
+        return self
+
+    @property
+    def heads(self):
+        """Célula (índice achatado) da cabeça de cada cobra."""
+        return self.body[self._all, self.head_ptr]
+
+    @property
+    def observation(self):
+        """
+        Planos (N, NUM_PLANES, rows, cols) de uint8. É uma view do buffer interno, atualizada a cada
+        `step`: copie se precisar guardar a observação de um tick.
+        """
+        return self.planes.reshape(self.num_envs, NUM_PLANES, self.rows, self.cols)
+
+    def features(self):
+        """Vetor de características (N, NUM_FEATURES) de float32, escrito sempre no mesmo buffer."""
+        b = self._buffers_features
+        # Cabeças lidas pelo índice achatado de (i, head_ptr[i]) em `body`, sem alocar como `heads`.
+        np.multiply(b.indices, self.num_cells, out=b.posicao)
+        b.posicao += self.head_ptr
+        np.take(self.body.reshape(-1), b.posicao, out=b.cabecas)
+        return _write_features(self.occupancy, b.cabecas, self.direction, self.food, self.cols, self.rows, self._features, b)
+
+    def _reset_envs(self, idx):
+        if len(idx) == 0:
+            return
+        center = (self.rows // 2) * self.cols + self.cols // 2
+        start_body = np.array([center - 2, center - 1, center], dtype=np.int32)
+
+        self.planes[idx] = 0
+        self.body[idx, :3] = start_body
+        self.occupancy[idx[:, None], start_body[None, :]] = 1
+        self.planes[idx, PLANE_HEAD, center] = 1
+        self.tail_ptr[idx] = 0
+        self.head_ptr[idx] = 2
+        self.length[idx] = 3
+        self.direction[idx] = RIGHT
+        self.score[idx] = 0
+        self.moves[idx] = 0
+        self.ticks[idx] = 0
+        self._place_food(idx)
+
+    def _place_food(self, idx):
+        """Sorteia a comida apenas entre as células livres dos tabuleiros em `idx`."""
+        self.planes[idx, PLANE_FOOD, self.food[idx]] = 0
+        self._draw_food(idx)
+        self.planes[idx, PLANE_FOOD, self.food[idx]] = 1
+
+    def _draw_food(self, idx):
+        pending = idx
+        for _ in range(_FOOD_RETRIES):
+            if len(pending) == 0:
+                return
+            candidates = self.rng.integers(0, self.num_cells, size=len(pending))
+            taken = self.occupancy[pending, candidates].astype(bool)
+            self.food[pending[~taken]] = candidates[~taken]
+            pending = pending[taken]
+
+        # Tabuleiros muito cheios: sorteia diretamente entre as células livres restantes.
+        for i in pending:
+            free_cells = np.flatnonzero(self.occupancy[i] == 0)
+            if len(free_cells) > 0:
+                self.food[i] = self.rng.choice(free_cells)
+
+    def step(self, actions):
+        """
+        Avança todas as partidas em um tick.
+        `actions` é um array de N direções (UP, RIGHT, DOWN, LEFT); -1 ou a direção oposta mantém a atual.
+        Retorna (recompensas, fins_de_jogo, registros), onde `registros` traz um dicionário
+        id/score/moves/time_seconds por partida encerrada neste tick.
+        """
+        actions = np.asarray(actions)
+        rows_idx = self._all
+
+        turn = (actions >= 0) & (actions != self.direction) & (actions != (self.direction + 2) % 4)
+        self.direction[turn] = actions[turn]
+        self.moves += turn
+        self.ticks += 1
+
+        heads = self.body[rows_idx, self.head_ptr]
+        new_x = heads % self.cols + DX[self.direction]
+        new_y = heads // self.cols + DY[self.direction]
+        wall = (new_x < 0) | (new_x >= self.cols) | (new_y < 0) | (new_y >= self.rows)
+        new_heads = np.where(wall, 0, new_y * self.cols + new_x)
+        ate = ~wall & (new_heads == self.food)
+
+        # A cauda anda antes do teste de colisão, então a cabeça pode ocupar a célula que ela deixou.
+        moving = ~wall & ~ate
+        moving_idx = rows_idx[moving]
+        self.occupancy[moving_idx, self.body[moving_idx, self.tail_ptr[moving_idx]]] = 0
+        self.tail_ptr[moving_idx] = (self.tail_ptr[moving_idx] + 1) % self.num_cells
+
+        self_hit = ~wall & self.occupancy[rows_idx, new_heads].astype(bool)
+        dones = wall | self_hit
+        alive_idx = rows_idx[~dones]
+        self.planes[alive_idx, PLANE_HEAD, heads[alive_idx]] = 0
+        self.planes[alive_idx, PLANE_HEAD, new_heads[alive_idx]] = 1
+        self.head_ptr[alive_idx] = (self.head_ptr[alive_idx] + 1) % self.num_cells
+        self.body[alive_idx, self.head_ptr[alive_idx]] = new_heads[alive_idx]
+        self.occupancy[alive_idx, new_heads[alive_idx]] = 1
+
+        self.score += ate
+        self.length += ate
+        rewards = ate.astype(np.int8) - dones.astype(np.int8)
+
+        # Uma cobra que ocupa o tabuleiro inteiro não tem onde pôr a comida: a partida termina.
+        full = ate & (self.length >= self.num_cells)
+        dones |= full
+        self._place_food(rows_idx[ate & ~full])
+
+        records = []
+        done_idx = rows_idx[dones]
+        if len(done_idx) > 0:
+            records = self._collect_records(done_idx)
+            self._reset_envs(done_idx)
+        return rewards, dones, records
+
+    def _collect_records(self, idx):
+        ids = range(self.next_id, self.next_id + len(idx))
+        self.next_id += len(idx)
+        return [
+            {"id": game_id, "score": int(score), "moves": int(moves), "time_seconds": int(ticks) // TICKS_PER_SECOND}
+            for game_id, score, moves, ticks in zip(ids, self.score[idx], self.moves[idx], self.ticks[idx])
+        ]
+
+
+class _BuffersFeatures:
+    """Vetores de trabalho de _write_features para um lote de `n` tabuleiros, alocados uma única vez."""
+
+    def __init__(self, n):
+        self.indices = np.arange(n)
+        self.cabecas = np.empty(n, dtype=np.int32)
+        self.dx = np.empty(n, dtype=DX.dtype)
+        self.dy = np.empty(n, dtype=DY.dtype)
+        self.direcao, self.d, self.head_x, self.head_y, self.x, self.y, self.cell, self.linha, self.posicao = (
+            np.empty(n, dtype=np.int64) for _ in range(9)
+        )
+        self.wall = np.empty(n, dtype=bool)
+        self.fora = np.empty(n, dtype=bool)
+        self.ocupada = np.empty(n, dtype=np.uint8)
+
+
+def _write_features(occupancy, heads, direction, food, cols, rows, out, buffers=None):
+    """
+    Preenche `out` (N, NUM_FEATURES) a partir do estado de N tabuleiros (células achatadas).
+    Todas as contas são feitas com ufuncs `out=` nos vetores de `buffers` (_BuffersFeatures), que o
+    BatchSnakeEnv guarda para não alocar nada a cada chamada.
+    """
+    b = buffers if buffers is not None else _BuffersFeatures(len(heads))
+    np.remainder(heads, cols, out=b.head_x)
+    np.floor_divide(heads, cols, out=b.head_y)
+    np.copyto(b.direcao, direction)
+    # As linhas de `occupancy` (contíguas na última dimensão) lidas como um único vetor: a célula c
+    # do tabuleiro i fica em i * passo + c, o que permite ler com np.take sem indexação avançada.
+    passo = occupancy.strides[0] // occupancy.itemsize
+    ocupacao = np.lib.stride_tricks.as_strided(
+        occupancy, shape=((len(heads) - 1) * passo + occupancy.shape[1],), strides=(occupancy.itemsize,)
+    )
+    np.multiply(b.indices, passo, out=b.linha)
+
+    # Perigo na célula vizinha à frente, à direita e à esquerda (parede ou corpo).
+    for k, turn in enumerate((0, 1, 3)):
+        np.add(b.direcao, turn, out=b.d)
+        np.remainder(b.d, 4, out=b.d)
+        np.take(DX, b.d, out=b.dx)
+        np.add(b.head_x, b.dx, out=b.x)
+        np.take(DY, b.d, out=b.dy)
+        np.add(b.head_y, b.dy, out=b.y)
+        np.less(b.x, 0, out=b.wall)
+        np.greater_equal(b.x, cols, out=b.fora)
+        b.wall |= b.fora
+        np.less(b.y, 0, out=b.fora)
+        b.wall |= b.fora
+        np.greater_equal(b.y, rows, out=b.fora)
+        b.wall |= b.fora
+        # Vizinhos fora do tabuleiro leem a célula 0 (o resultado já é 1 pela parede).
+        np.multiply(b.y, cols, out=b.cell)
+        b.cell += b.x
+        np.copyto(b.cell, 0, where=b.wall)
+        np.add(b.linha, b.cell, out=b.posicao)
+        np.take(ocupacao, b.posicao, out=b.ocupada)
+        np.logical_or(b.wall, b.ocupada, out=out[:, k])
+
+    # Direção atual em one-hot, escrita pelo índice achatado de (i, 3 + direção).
+    out[:, 3:7] = 0
+    np.multiply(b.indices, out.shape[1], out=b.posicao)
+    b.posicao += b.direcao
+    b.posicao += 3
+    np.put(out, b.posicao, 1)
+
+    np.remainder(food, cols, out=b.x)
+    np.floor_divide(food, cols, out=b.y)
+    np.less(b.x, b.head_x, out=out[:, 7])
+    np.greater(b.x, b.head_x, out=out[:, 8])
+    np.less(b.y, b.head_y, out=out[:, 9])
+    np.greater(b.y, b.head_y, out=out[:, 10])
+    return out
+
+
+def observe_single(env, kind="planes"):
+    """
+    Observação no mesmo layout do BatchSnakeEnv (lote de 1) para um SnakeEnv, para que um modelo
+    treinado em lote possa jogar no snake_game.py. O plano do corpo é lido direto do bytearray
+    de ocupação do SnakeEnv.
+    """
+    occupancy = np.frombuffer(env.occupancy, dtype=np.uint8).reshape(1, -1)
+    head = np.array([env.head[1] * env.cols + env.head[0]])
+    food = np.array([env.food_pos[1] * env.cols + env.food_pos[0] if env.food_pos is not None else -1])
+    if kind == "features":
+        return _write_features(occupancy, head, np.array([env.direction]), np.maximum(food, 0), env.cols, env.rows,
+                               np.zeros((1, NUM_FEATURES), dtype=np.float32))
+    planes = np.zeros((1, NUM_PLANES, env.rows * env.cols), dtype=np.uint8)
+    planes[0, PLANE_BODY] = occupancy[0]
+    planes[0, PLANE_HEAD, head[0]] = 1
+    if food[0] >= 0:
+        planes[0, PLANE_FOOD, food[0]] = 1
+    return planes.reshape(1, NUM_PLANES, env.rows, env.cols)
+
+
+def model_policy(model, kind="planes"):
+    """
+    Adapta um modelo em lote `model(obs) -> actions` à interface `policy(env)` de `evaluate`.
+    `obs` é `env.observation` (kind="planes") ou `env.features()` (kind="features"); o modelo
+    devolve uma direção (ou -1 para seguir em frente) por partida.
+    """
+    if kind == "features":
+        return lambda env: model(env.features())
+    return lambda env: model(env.observation)
+
+
+def single_game_policy(model, kind="planes"):
+    """Mesma ideia para o SnakeEnv de uma partida só (ex.: snake_game.py --agente modulo:fabrica)."""
+    def policy(env):
+        action = int(np.asarray(model(observe_single(env, kind)))[0])
+        # No SnakeEnv, "seguir em frente" é None.
+        return action if action >= 0 else None
+    return policy
+
+
+def greedy_features_model(features):
+    """
+    Modelo de exemplo sobre o vetor de características: vira para o lado da comida quando não há
+    perigo, desvia quando há perigo à frente e segue em frente caso contrário.
+    """
+    danger_ahead, danger_right, danger_left = features[:, 0], features[:, 1], features[:, 2]
+    direction = np.argmax(features[:, 3:7], axis=1)
+    food = features[:, 7:11]  # esquerda, direita, acima, abaixo
+    # Direções que aproximam da comida, na ordem UP, RIGHT, DOWN, LEFT.
+    wants = np.stack([food[:, 2], food[:, 1], food[:, 3], food[:, 0]], axis=1).astype(bool)
+    right, left = (direction + 1) % 4, (direction + 3) % 4
+    rows_idx = np.arange(len(features))
+    actions = np.full(len(features), -1, dtype=np.int64)
+    turn_right = ~danger_right.astype(bool) & wants[rows_idx, right]
+    turn_left = ~danger_left.astype(bool) & wants[rows_idx, left]
+    actions[turn_left] = left[turn_left]
+    actions[turn_right] = right[turn_right]
+    blocked = danger_ahead.astype(bool) & (actions == -1)
+    actions[blocked & ~danger_right.astype(bool)] = right[blocked & ~danger_right.astype(bool)]
+    actions[blocked & danger_right.astype(bool)] = left[blocked & danger_right.astype(bool)]
+    return actions
+
+
+def evaluate(policy, num_episodes, num_envs=1024, **env_kwargs):
+    """
+    Joga `num_episodes` partidas com `policy(env) -> actions` e devolve a lista de registros
+    no formato de save_stats_to_json, na ordem em que as partidas terminaram.
+    """
+    env = BatchSnakeEnv(num_envs, **env_kwargs)
+    records = []
+    while len(records) < num_episodes:
+        _, _, finished = env.step(policy(env))
+        records.extend(finished)
+    return records[:num_episodes]
+
+
+def random_policy(env):
+    """Política de referência: uma direção aleatória por partida a cada tick."""
+    return env.rng.integers(0, 4, size=env.num_envs)
@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+
+# Tamanho do bloco lido de trás para frente ao procurar o último registro do arquivo.
+_TAIL_BLOCK = 4096
+
+
+# --- 1. ESCRITA (APPEND-ONLY) ---
+
+def append_record(filename, record):
+    """
+    Acrescenta um registro ao final de um arquivo JSON Lines com uma única chamada de escrita
+    em modo O_APPEND, sem nunca reescrever o histórico já salvo.
+    Se a última linha ficou incompleta (queda no meio de uma escrita), ela é isolada por uma
+    quebra de linha e passa a ser ignorada pelos leitores.
+    """
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+    fd = os.open(filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        size = os.fstat(fd).st_size
+        if size > 0 and not _ends_with_newline(filename, size):
+            line = b"\n" + line
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def _ends_with_newline(filename, size):
+    with open(filename, "rb") as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+
+def save_game_record(filename, score, moves, time_seconds):
+    """Salva uma partida com o próximo id sequencial e retorna o id atribuído."""
+    new_id = last_id(filename) + 1
+    append_record(filename, {"id": new_id, "score": score, "moves": moves, "time_seconds": time_seconds})
+    return new_id
+
+
+# --- 2. LEITURA ---
+
+def parse_line(line):
+    """Interpreta uma linha do log; retorna None se ela estiver corrompida."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def last_id(filename):
+    """
+    Retorna o id do último registro válido do arquivo (0 se não houver nenhum),
+    lendo apenas o final do arquivo em vez de interpretar o histórico inteiro.
+    """
+    try:
+        f = open(filename, "rb")
+    except FileNotFoundError:
+        return 0
+    with f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        buffer = b""
+        while end > 0:
+            start = max(0, end - _TAIL_BLOCK)
+            f.seek(start)
+            buffer = f.read(end - start) + buffer
+            end = start
+            lines = buffer.split(b"\n")
+            # A primeira linha pode estar cortada pelo bloco; só é confiável quando chegamos ao início.
+            candidates = lines if start == 0 else lines[1:]
+            for line in reversed(candidates):
+                record = parse_line(line) if line.strip() else None
+                if record is not None and "id" in record:
+                    return int(record["id"])
+            buffer = lines[0] if start > 0 else b""
+    return 0
+
+
+def read_records(filename):
+    """Lê todos os registros válidos de um arquivo JSON Lines, ignorando linhas corrompidas."""
+    records = []
+    with open(filename, "rb") as f:
+        for line in f:
+            if line.strip():
+                record = parse_line(line)
+                if record is not None:
+                    records.append(record)
+    return records
+
+
+def nome_do_agente(arquivo):
+    """Extrai o nome do agente de um caminho como 'pasta/stats_agente.json' ou 'stats_agente.jsonl'."""
+    nome_arquivo = os.path.basename(arquivo.replace("\\", "/"))
+    return os.path.splitext(nome_arquivo)[0].replace("stats_", "", 1)
+
+
+def read_any(filename):
+    """Lê tanto o formato JSON Lines (.jsonl) quanto os arrays JSON legados (.json)."""
+    if filename.endswith(".jsonl"):
+        return read_records(filename)
+    with open(filename, "r") as f:
+        return json.load(f)
+
+
+# --- 3. MANUTENÇÃO: COMPACTAÇÃO E EXPORTAÇÃO ---
+
+def _atomic_write(filename, write_fn):
+    """Escreve em um arquivo temporário e o troca pelo destino só quando a escrita termina."""
+    tmp_name = filename + ".tmp"
+    with open(tmp_name, "w") as f:
+        write_fn(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_name, filename)
+
+
+def compact(filename):
+    """Reescreve o log sem as linhas corrompidas. Retorna o número de registros mantidos."""
+    records = read_records(filename)
+    _atomic_write(filename, lambda f: f.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+    return len(records)
+
+
+def write_records_json(destination, records):
+    """Grava `records` como o array JSON lido pelo dashboard, trocando o arquivo de forma atômica."""
+    _atomic_write(destination, lambda f: json.dump(records, f))
+
+
+def export_json(source, destination):
+    """Exporta um log (ou array legado) para o array JSON lido pelo dashboard."""
+    records = read_any(source)
+    write_records_json(destination, records)
+    return len(records)
+
+
+def import_json(source, destination):
+    """Converte um array JSON legado (ex.: game_stats.json) para um log JSON Lines."""
+    records = read_any(source)
+    _atomic_write(destination, lambda f: f.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+    return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ferramentas para os logs de estatísticas em JSON Lines.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_compact = sub.add_parser("compact", help="Remove linhas corrompidas de um log .jsonl.")
+    p_compact.add_argument("arquivo")
+    p_export = sub.add_parser("export", help="Exporta um log .jsonl para um array JSON (.json).")
+    p_export.add_argument("origem")
+    p_export.add_argument("destino")
+    p_import = sub.add_parser("import", help="Converte um array JSON legado para .jsonl.")
+    p_import.add_argument("origem")
+    p_import.add_argument("destino")
+    args = parser.parse_args()
+
+    if args.comando == "compact":
+        total = compact(args.arquivo)
+        print(f"'{args.arquivo}' compactado: {total} registros mantidos.")
+    elif args.comando == "export":
+        total = export_json(args.origem, args.destino)
+        print(f"{total} registros exportados para '{args.destino}'.")
+    else:
+        total = import_json(args.origem, args.destino)
+        print(f"{total} registros convertidos para '{args.destino}'.")
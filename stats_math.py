@@ -0,0 +1,165 @@
+import numpy as np
+
+# Estatísticas do dashboard calculadas em forma fechada com NumPy, a partir de somas acumuladas.
+# As funções "grouped_*" recebem os valores de vários agentes concatenados, com cada agente ocupando
+# um bloco contíguo, e `offsets` com o início de cada bloco seguido do total (len(offsets) = grupos + 1).
+
+
+def _cumsum0(values):
+    """Soma acumulada com um zero na frente; inteiros são acumulados em int64 (exatos)."""
+    dtype = np.int64 if np.issubdtype(values.dtype, np.integer) else np.float64
+    out = np.zeros(len(values) + 1, dtype=dtype)
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+def _somas_janela(c, offsets, window):
+    """
+    Soma de cada janela de até `window` posições terminando em i (sem atravessar o início do grupo)
+    e o número de pontos em cada janela. Só as primeiras `window` posições de cada grupo têm janelas
+    truncadas, então o caso geral é um deslocamento simples e apenas essas posições são corrigidas.
+    """
+    n = len(c) - 1
+    somas = np.empty(n, dtype=c.dtype)
+    k = np.full(n, window, dtype=np.int64)
+    somas[:] = c[1:]
+    if window < n:
+        somas[window:] -= c[1:n - window + 1]
+    offsets = np.asarray(offsets)
+    for inicio, fim in zip(offsets[:-1], offsets[1:]):
+        cabeca = min(fim, inicio + window)
+        if cabeca > inicio:
+            somas[inicio:cabeca] = c[inicio + 1:cabeca + 1] - c[inicio]
+            k[inicio:cabeca] = np.arange(1, cabeca - inicio + 1)
+    return somas, k
+
+
+def _somas_validas(values, offsets, window):
+    """
+    Como _somas_janela, mas ignorando valores NaN, como o pandas: eles entram como 0 na soma acumulada
+    e o número de pontos de cada janela vem da soma acumulada dos valores válidos. Sem isso, um único
+    NaN tornaria NaN todas as somas seguintes, inclusive as dos grupos depois dele.
+    """
+    if np.issubdtype(values.dtype, np.floating):
+        ausentes = np.isnan(values)
+        if ausentes.any():
+            somas, _ = _somas_janela(_cumsum0(np.where(ausentes, 0.0, values)), offsets, window)
+            k, _ = _somas_janela(_cumsum0(~ausentes), offsets, window)
+            return somas, k
+    return _somas_janela(_cumsum0(values), offsets, window)
+
+
+def ols_slope(y):
+    """
+    Slope de mínimos quadrados de `y` contra o índice 0..n-1 (0 se houver menos de 2 pontos válidos).
+    Pontos NaN são ignorados; os demais mantêm o seu índice.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n < 2:
+        return 0.0
+    soma = y.sum()
+    if np.isnan(soma):
+        x = np.flatnonzero(~np.isnan(y)).astype(np.float64)
+        if len(x) < 2:
+            return 0.0
+        y = y[x.astype(np.int64)]
+        x -= x.mean()
+        return float(np.dot(x, y) / np.dot(x, x))
+    # Σ(x - x̄)² para x = 0..n-1 tem forma fechada n(n² - 1)/12.
+    sxx = n * (n * n - 1) / 12.0
+    sxy = np.dot(np.arange(n, dtype=np.float64), y) - (n - 1) / 2.0 * soma
+    return float(sxy / sxx)
+
+
+def grouped_slopes(values, offsets):
+    """
+    Slope de cada grupo contra o seu índice local 0..n-1 (0 para grupos com menos de 2 pontos).
+    Grupos com valores NaN passam por ols_slope, que os ignora.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    offsets = np.asarray(offsets)
+    tamanhos = np.diff(offsets)
+    x = np.arange(tamanhos.max() if len(tamanhos) else 0, dtype=np.float64)
+    slopes = np.zeros(len(tamanhos))
+    for g, (inicio, fim) in enumerate(zip(offsets[:-1], offsets[1:])):
+        n = fim - inicio
+        if n >= 2:
+            y = values[inicio:fim]
+            soma = y.sum()
+            if np.isnan(soma):
+                slopes[g] = ols_slope(y)
+            else:
+                slopes[g] = (np.dot(x[:n], y) - (n - 1) / 2.0 * soma) / (n * (n * n - 1) / 12.0)
+    return slopes
+
+
+def grouped_rolling_mean(values, offsets, window):
+    """
+    Média móvel de cada grupo, equivalente a `rolling(window, min_periods=1).mean()` por agente:
+    valores NaN são ignorados e uma janela sem nenhum valor válido dá NaN.
+    """
+    somas, k = _somas_validas(np.asarray(values), offsets, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return somas / k
+
+
+def grouped_rolling_std(values, offsets, window):
+    """
+    Desvio padrão móvel (ddof=1) de cada grupo; NaN onde a janela tem menos de dois valores válidos
+    (valores NaN são ignorados), como no pandas.
+    """
+    values = np.asarray(values)
+    quadrados = values.astype(np.int64) ** 2 if np.issubdtype(values.dtype, np.integer) else values * values
+    somas, k = _somas_validas(values, offsets, window)
+    somas2, _ = _somas_validas(quadrados, offsets, window)
+    somas = somas.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = (somas2 - somas * somas / k) / (k - 1)
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def grouped_sliding_slopes(values, offsets, window):
+    """
+    Slope de cada janela deslizante de até `window` pontos que termina em cada posição (restrita ao
+    próprio grupo). Útil para acompanhar como a taxa de aprendizado varia ao longo do treino.
+    NaN onde a janela tem menos de 2 pontos.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    idx = np.arange(len(values), dtype=np.float64)
+    soma_y, k = _somas_janela(_cumsum0(values), offsets, window)
+    soma_idx_y, _ = _somas_janela(_cumsum0(idx * values), offsets, window)
+    # Σ j·y com j relativo ao início da janela (idx - k + 1) = Σ idx·y - (idx - k + 1)·Σ y
+    soma_jy = soma_idx_y - (idx - k + 1) * soma_y
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(k >= 2, (soma_jy - (k - 1) / 2.0 * soma_y) / (k * (k * k - 1) / 12.0), np.nan)
+
+
+def group_offsets(keys):
+    """
+    Ordena as posições por grupo (de forma estável, preservando a ordem dentro de cada grupo).
+    Retorna (ordem, offsets, grupos), onde `ordem` é None quando os grupos já estão contíguos.
+    """
+    keys = np.asarray(keys)
+    if len(keys) == 0:
+        return None, np.zeros(1, dtype=np.int64), keys[:0]
+    mudancas = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    inicios = np.concatenate(([0], mudancas))
+    grupos = keys[inicios]
+    if len(np.unique(grupos)) == len(grupos):
+        return None, np.append(inicios, len(keys)), grupos
+    ordem = np.argsort(keys, kind="stable")
+    ordenadas = keys[ordem]
+    inicios = np.concatenate(([0], np.flatnonzero(ordenadas[1:] != ordenadas[:-1]) + 1))
+    return ordem, np.append(inicios, len(keys)), ordenadas[inicios]
+
+
+def rolling_mean_by_group(values, keys, window):
+    """Média móvel por grupo (`keys`), devolvida na ordem original das linhas."""
+    values = np.asarray(values)
+    ordem, offsets, _ = group_offsets(keys)
+    if ordem is None:
+        return grouped_rolling_mean(values, offsets, window)
+    resultado = np.empty(len(values), dtype=np.float64)
+    resultado[ordem] = grouped_rolling_mean(values[ordem], offsets, window)
+    return resultado
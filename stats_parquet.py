@@ -0,0 +1,130 @@
+import argparse
+import glob
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from stats_log import nome_do_agente, read_any
+
+# Diretório padrão do dataset, com uma partição por agente: stats_dataset/agent=<nome>/part-0.parquet
+DIRETORIO_PADRAO = "stats_dataset"
+COLUNAS_INT32 = ("id", "score", "moves", "time_seconds")
+SCHEMA = pa.schema([(coluna, pa.int32()) for coluna in COLUNAS_INT32])
+# O nome do agente é sempre texto, mesmo que pareça um número (ex.: agent=2).
+PARTICIONAMENTO = ds.partitioning(pa.schema([("agent", pa.string())]), flavor="hive")
+
+
+def _caminho_particao(diretorio, agente):
+    return os.path.join(diretorio, f"agent={agente}")
+
+
+# --- 1. INGESTÃO ---
+
+def escrever_particao(agente, tabelas, diretorio=DIRETORIO_PADRAO):
+    """
+    Grava a partição de `agente` (substituindo a anterior) a partir de um iterável de tabelas com o
+    SCHEMA, cada uma virando um row group; assim a partição pode ser escrita em lotes com memória limitada.
+    Retorna o número de linhas gravadas.
+    """
+    particao = _caminho_particao(diretorio, agente)
+    # O prefixo "." faz o pyarrow ignorar a partição temporária enquanto ela é escrita.
+    temporaria = os.path.join(diretorio, f".tmp-agent={agente}")
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+    linhas = 0
+    with pq.ParquetWriter(os.path.join(temporaria, "part-0.parquet"), SCHEMA) as escritor:
+        for tabela in tabelas:
+            escritor.write_table(tabela)
+            linhas += tabela.num_rows
+    # Troca a partição inteira de uma vez para que um leitor nunca veja dados pela metade.
+    shutil.rmtree(particao, ignore_errors=True)
+    os.replace(temporaria, particao)
+    return linhas
+
+
+def _tabela_do_arquivo(arquivo):
+    """Lê um arquivo de estatísticas como uma tabela com o SCHEMA."""
+    registros = read_any(arquivo)
+    return pa.table(
+        {coluna: pa.array([r.get(coluna, 0) for r in registros], type=pa.int32()) for coluna in COLUNAS_INT32},
+        schema=SCHEMA,
+    )
+
+
+def converter_agente(agente, arquivos, diretorio=DIRETORIO_PADRAO):
+    """
+    Converte todos os arquivos de estatísticas de `agente` na sua partição Parquet (substituindo a
+    anterior), com um row group por arquivo, na ordem dos caminhos (a mesma do IncrementalLoader).
+    """
+    return escrever_particao(agente, (_tabela_do_arquivo(arquivo) for arquivo in sorted(arquivos)), diretorio)
+
+
+def ingerir(padroes=("stats_*.json", "stats_*.jsonl"), diretorio=DIRETORIO_PADRAO, forcar=False):
+    """
+    Converte todos os arquivos de estatísticas encontrados para o dataset particionado. Os arquivos de
+    um mesmo agente (ex.: stats_x.json e stats_x.jsonl, como os deixa `stats_log.py import`) vão juntos
+    para a partição dele. Partições mais recentes que o arquivo mais novo do agente são puladas, a
+    menos que `forcar` seja True.
+    Retorna um dicionário {agente: linhas convertidas}.
+    """
+    arquivos_por_agente = {}
+    for arquivo in sorted({a for padrao in padroes for a in glob.glob(padrao)}):
+        arquivos_por_agente.setdefault(nome_do_agente(arquivo), []).append(arquivo)
+    convertidos = {}
+    for agente, arquivos in arquivos_por_agente.items():
+        particao = os.path.join(_caminho_particao(diretorio, agente), "part-0.parquet")
+        mais_recente = max(os.path.getmtime(arquivo) for arquivo in arquivos)
+        if not forcar and os.path.exists(particao) and os.path.getmtime(particao) >= mais_recente:
+            continue
+        convertidos[agente] = converter_agente(agente, arquivos, diretorio)
+    return convertidos
+
+
+# --- 2. LEITURA ---
+
+def listar_agentes(diretorio=DIRETORIO_PADRAO):
+    """Lista os agentes disponíveis a partir dos nomes das partições, sem ler nenhum dado."""
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(
+        nome.split("=", 1)[1] for nome in os.listdir(diretorio)
+        if nome.startswith("agent=")
+    )
+
+
+def versao_dataset(diretorio=DIRETORIO_PADRAO):
+    """Identifica o estado atual do dataset pelo mtime de cada partição, para invalidar caches derivados."""
+    return tuple(
+        (agente, os.stat(_caminho_particao(diretorio, agente)).st_mtime_ns)
+        for agente in listar_agentes(diretorio)
+    )
+
+
+def carregar_dataset(diretorio=DIRETORIO_PADRAO, agentes=None, colunas=COLUNAS_INT32):
+    """
+    Lê o dataset como DataFrame com a coluna 'agent' categórica. O filtro por agentes é aplicado nas
+    partições (apenas os arquivos dos agentes pedidos são abertos) e só as `colunas` são lidas.
+    As partidas de cada agente vêm contíguas, na ordem em que foram gravadas.
+    """
+    dataset = ds.dataset(diretorio, format="parquet", partitioning=PARTICIONAMENTO, exclude_invalid_files=True)
+    filtro = ds.field("agent").isin(pa.array(list(agentes), type=pa.string())) if agentes is not None else None
+    tabela = dataset.to_table(columns=list(colunas) + ["agent"], filter=filtro)
+    # Codificada como dicionário no Arrow, a coluna 'agent' já chega ao pandas como categórica.
+    tabela = tabela.set_column(tabela.schema.get_field_index("agent"), "agent", tabela.column("agent").dictionary_encode())
+    return tabela.to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converte os arquivos stats_*.json/.jsonl em um dataset Parquet particionado por agente.")
+    parser.add_argument("padroes", nargs="*", default=["stats_*.json", "stats_*.jsonl"], help="Padrões glob dos arquivos de origem.")
+    parser.add_argument("--destino", default=DIRETORIO_PADRAO, help="Diretório do dataset Parquet.")
+    parser.add_argument("--forcar", action="store_true", help="Reconverte mesmo as partições que já estão atualizadas.")
+    args = parser.parse_args()
+
+    convertidos = ingerir(args.padroes, args.destino, args.forcar)
+    for agente, linhas in convertidos.items():
+        print(f"Agente '{agente}': {linhas} partidas convertidas.")
+    print(f"Dataset '{args.destino}' atualizado ({len(convertidos)} partições reescritas).")